@@ -0,0 +1,47 @@
+"""Indexes for the cost listing and notification lookups.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Plain CREATE INDEX statements: no table rebuild, so existing databases
+    # stay readable while the indexes are built.
+    op.create_index("ix_cost_date", "cost", ["date"], if_not_exists=True)
+    op.create_index(
+        "ix_cost_member_id_date", "cost", ["member_id", "date"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_notification_member_id_created_at",
+        "notification",
+        ["member_id", "created_at"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_notification_member_id_is_read_created_at",
+        "notification",
+        ["member_id", "is_read", "created_at"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_notification_member_id_is_read_created_at", "notification")
+    op.drop_index("ix_notification_member_id_created_at", "notification")
+    op.drop_index("ix_cost_member_id_date", "cost")
+    op.drop_index("ix_cost_date", "cost")
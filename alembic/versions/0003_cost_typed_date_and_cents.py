@@ -0,0 +1,83 @@
+"""Store cost dates as DATE and amounts as integer cents.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _to_date_sql(column: str) -> str:
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite keeps DATE values as ISO strings; date() also strips any time part.
+        return f"date({column})"
+    return f"CAST({column} AS DATE)"
+
+
+def _rebuild_date_indexes(drop: bool) -> None:
+    if drop:
+        op.drop_index("ix_cost_member_id_date", "cost")
+        op.drop_index("ix_cost_date", "cost")
+    else:
+        op.create_index("ix_cost_date", "cost", ["date"])
+        op.create_index("ix_cost_member_id_date", "cost", ["member_id", "date"])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The date column is copied into a fresh DATE column instead of being
+    # altered in place: batch mode on SQLite would CAST the ISO strings to a
+    # numeric value.
+    _rebuild_date_indexes(drop=True)
+    with op.batch_alter_table("cost") as batch_op:
+        batch_op.add_column(sa.Column("amount_cents", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("date_value", sa.Date(), nullable=True))
+    op.execute(
+        "UPDATE cost SET amount_cents = CAST(ROUND(amount * 100) AS INTEGER), "
+        f"date_value = {_to_date_sql('date')}"
+    )
+    with op.batch_alter_table("cost") as batch_op:
+        batch_op.drop_column("amount")
+        batch_op.drop_column("date")
+        batch_op.alter_column("amount_cents", existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column(
+            "date_value",
+            new_column_name="date",
+            existing_type=sa.Date(),
+            nullable=False,
+        )
+    _rebuild_date_indexes(drop=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rebuild_date_indexes(drop=True)
+    with op.batch_alter_table("cost") as batch_op:
+        batch_op.add_column(sa.Column("amount", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("date_text", sa.String(), nullable=True))
+    op.execute(
+        "UPDATE cost SET amount = amount_cents / 100.0, "
+        "date_text = CAST(date AS VARCHAR)"
+    )
+    with op.batch_alter_table("cost") as batch_op:
+        batch_op.drop_column("amount_cents")
+        batch_op.drop_column("date")
+        batch_op.alter_column("amount", existing_type=sa.Float(), nullable=False)
+        batch_op.alter_column(
+            "date_text",
+            new_column_name="date",
+            existing_type=sa.String(),
+            nullable=False,
+        )
+    _rebuild_date_indexes(drop=False)
@@ -0,0 +1,83 @@
+"""Weekly cost rollup per member and category.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rollup = op.create_table(
+        "weekly_cost_rollup",
+        sa.Column("week_start", sa.Date(), nullable=False),
+        sa.Column("member_id", sa.Integer(), nullable=False),
+        sa.Column("category", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("cost_count", sa.Integer(), nullable=False),
+        sa.Column("amount_cents", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["member_id"], ["member.id"]),
+        sa.PrimaryKeyConstraint("week_start", "member_id", "category"),
+    )
+    # Backfill from the existing costs, grouped per day in SQL and folded
+    # into weeks here so the week arithmetic does not depend on the dialect.
+    cost = sa.table(
+        "cost",
+        sa.column("date", sa.Date()),
+        sa.column("member_id", sa.Integer()),
+        sa.column("category", sa.String()),
+        sa.column("amount_cents", sa.Integer()),
+    )
+    per_day = op.get_bind().execute(
+        sa.select(
+            cost.c.date,
+            cost.c.member_id,
+            cost.c.category,
+            sa.func.count(),
+            sa.func.sum(cost.c.amount_cents),
+        ).group_by(cost.c.date, cost.c.member_id, cost.c.category)
+    )
+    totals = defaultdict(lambda: [0, 0])
+    for cost_date, member_id, category, count, amount_cents in per_day:
+        if isinstance(cost_date, str):
+            cost_date = date.fromisoformat(cost_date)
+        week_start = cost_date - timedelta(days=cost_date.weekday())
+        entry = totals[(week_start, member_id, category)]
+        entry[0] += count
+        entry[1] += amount_cents
+    if totals:
+        op.bulk_insert(
+            rollup,
+            [
+                {
+                    "week_start": week_start,
+                    "member_id": member_id,
+                    "category": category,
+                    "cost_count": count,
+                    "amount_cents": amount_cents,
+                }
+                for (week_start, member_id, category), (
+                    count,
+                    amount_cents,
+                ) in totals.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("weekly_cost_rollup")
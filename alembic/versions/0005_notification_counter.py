@@ -0,0 +1,49 @@
+"""Unread notification counter per member.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    counter = op.create_table(
+        "notification_counter",
+        sa.Column("member_id", sa.Integer(), nullable=False),
+        sa.Column("unread_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["member_id"], ["member.id"]),
+        sa.PrimaryKeyConstraint("member_id"),
+    )
+    notification = sa.table(
+        "notification",
+        sa.column("member_id", sa.Integer()),
+        sa.column("is_read", sa.Boolean()),
+    )
+    unread = op.get_bind().execute(
+        sa.select(notification.c.member_id, sa.func.count())
+        .where(notification.c.is_read == sa.false())
+        .group_by(notification.c.member_id)
+    )
+    rows = [
+        {"member_id": member_id, "unread_count": count} for member_id, count in unread
+    ]
+    if rows:
+        op.bulk_insert(counter, rows)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("notification_counter")
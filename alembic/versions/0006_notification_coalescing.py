@@ -0,0 +1,47 @@
+"""Booking details on notifications, for coalescing repeated bookings.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing notifications have no actor and are never coalesced.
+    with op.batch_alter_table("notification") as batch_op:
+        batch_op.add_column(sa.Column("actor_id", sa.Integer(), nullable=True))
+        batch_op.add_column(
+            sa.Column("kind", sa.String(), nullable=False, server_default="costs")
+        )
+        batch_op.add_column(
+            sa.Column("booking_count", sa.Integer(), nullable=False, server_default="1")
+        )
+        batch_op.add_column(
+            sa.Column("amount_cents", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.create_foreign_key(
+            "fk_notification_actor_id_member", "member", ["actor_id"], ["id"]
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("notification") as batch_op:
+        batch_op.drop_constraint("fk_notification_actor_id_member", type_="foreignkey")
+        batch_op.drop_column("amount_cents")
+        batch_op.drop_column("booking_count")
+        batch_op.drop_column("kind")
+        batch_op.drop_column("actor_id")
@@ -0,0 +1,55 @@
+"""Booking journal with idempotency keys.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "booking_journal",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("idempotency_key", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("operator_id", sa.Integer(), nullable=False),
+        sa.Column("member_id", sa.Integer(), nullable=False),
+        sa.Column("cost_id", sa.Integer(), nullable=False),
+        sa.Column("notification_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("undone_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["member_id"], ["member.id"]),
+        sa.ForeignKeyConstraint(["operator_id"], ["member.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_booking_journal_idempotency_key",
+        "booking_journal",
+        ["idempotency_key"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_booking_journal_operator_id_id",
+        "booking_journal",
+        ["operator_id", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_booking_journal_operator_id_id", "booking_journal")
+    op.drop_index("ix_booking_journal_idempotency_key", "booking_journal")
+    op.drop_table("booking_journal")
@@ -0,0 +1,81 @@
+"""Monthly cost rollup per member and category.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+
+from collections import defaultdict
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rollup = op.create_table(
+        "monthly_cost_rollup",
+        sa.Column("month_start", sa.Date(), nullable=False),
+        sa.Column("member_id", sa.Integer(), nullable=False),
+        sa.Column("category", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("cost_count", sa.Integer(), nullable=False),
+        sa.Column("amount_cents", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["member_id"], ["member.id"]),
+        sa.PrimaryKeyConstraint("month_start", "member_id", "category"),
+    )
+    # Backfill like 0004: grouped per day in SQL, folded into months here.
+    cost = sa.table(
+        "cost",
+        sa.column("date", sa.Date()),
+        sa.column("member_id", sa.Integer()),
+        sa.column("category", sa.String()),
+        sa.column("amount_cents", sa.Integer()),
+    )
+    per_day = op.get_bind().execute(
+        sa.select(
+            cost.c.date,
+            cost.c.member_id,
+            cost.c.category,
+            sa.func.count(),
+            sa.func.sum(cost.c.amount_cents),
+        ).group_by(cost.c.date, cost.c.member_id, cost.c.category)
+    )
+    totals = defaultdict(lambda: [0, 0])
+    for cost_date, member_id, category, count, amount_cents in per_day:
+        if isinstance(cost_date, str):
+            cost_date = date.fromisoformat(cost_date)
+        entry = totals[(cost_date.replace(day=1), member_id, category)]
+        entry[0] += count
+        entry[1] += amount_cents
+    if totals:
+        op.bulk_insert(
+            rollup,
+            [
+                {
+                    "month_start": month_start,
+                    "member_id": member_id,
+                    "category": category,
+                    "cost_count": count,
+                    "amount_cents": amount_cents,
+                }
+                for (month_start, member_id, category), (
+                    count,
+                    amount_cents,
+                ) in totals.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("monthly_cost_rollup")
@@ -0,0 +1,160 @@
+"""Summary figures for the cost pages, computed in SQL.
+
+The summary cards only need a sum and two counts, so they are answered by a
+single aggregate query over the weekly rollup instead of iterating over
+loaded rows. The dashboard series come from the monthly rollup, a bounded
+number of rows per month however many years of bookings exist. Results are
+cached briefly per filter and dropped whenever a cost is written, by any
+backend worker.
+"""
+
+from cachetools import TTLCache
+from sqlalchemy import distinct, func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import (
+    QUICK_DRINKS,
+    CategoryShare,
+    CostSummary,
+    DashboardSeries,
+    Member,
+    MonthlyCostRollup,
+    MonthlySpending,
+    WeeklyCostRollup,
+    from_cents,
+    member_name_contains,
+    month_start_of,
+)
+from app.shared_cache import bump_generation, generation
+import datetime as dt
+import os
+
+SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "30"))
+_summary_cache: TTLCache = TTLCache(maxsize=256, ttl=SUMMARY_CACHE_TTL)
+
+EMPTY_SUMMARY: CostSummary = {"total_cents": 0, "count": 0, "members": 0}
+
+_dashboard_cache: TTLCache = TTLCache(maxsize=256, ttl=SUMMARY_CACHE_TTL)
+
+EMPTY_DASHBOARD: DashboardSeries = {
+    "monthly": [],
+    "categories": [],
+    "total_cents": 0,
+    "count": 0,
+}
+
+# Chart series per category. The category names contain dots, which the
+# charts would read as nested keys; unknown categories count as other.
+CATEGORY_SERIES = {
+    QUICK_DRINKS["non-alcoholic"]["category"]: "non_alcoholic",
+    QUICK_DRINKS["alcoholic"]["category"]: "alcoholic",
+    "Anderes": "other",
+}
+
+
+async def cost_summary(
+    session: AsyncSession, member_id: int | None = None, name_query: str = ""
+) -> CostSummary:
+    """Sum, count and distinct members of the costs matching the filter."""
+    name_query = name_query.strip()
+    key = (await generation("costs"), member_id, name_query.lower())
+    cached = _summary_cache.get(key)
+    if cached is not None:
+        return cached
+    query = select(
+        func.coalesce(func.sum(WeeklyCostRollup.amount_cents), 0),
+        func.coalesce(func.sum(WeeklyCostRollup.cost_count), 0),
+        func.count(distinct(WeeklyCostRollup.member_id)),
+    )
+    if member_id is not None:
+        query = query.where(WeeklyCostRollup.member_id == member_id)
+    if name_query:
+        query = query.join(Member, WeeklyCostRollup.member_id == Member.id).where(
+            member_name_contains(name_query)
+        )
+    total_cents, count, members = (await session.exec(query)).one()
+    summary: CostSummary = {
+        "total_cents": int(total_cents),
+        "count": int(count),
+        "members": members,
+    }
+    _summary_cache[key] = summary
+    return summary
+
+
+def _month_starts(last: dt.date, months: int) -> list[dt.date]:
+    """The first days of the `months` months up to and including last's."""
+    index = last.year * 12 + last.month - 1
+    return [
+        dt.date(month // 12, month % 12 + 1, 1)
+        for month in range(index - months + 1, index + 1)
+    ]
+
+
+async def dashboard_series(
+    session: AsyncSession, months: int, member_id: int | None = None
+) -> DashboardSeries:
+    """Spending per month and per category over the last `months` months."""
+    month_starts = _month_starts(month_start_of(dt.date.today()), months)
+    key = (await generation("costs"), member_id, month_starts[0], months)
+    cached = _dashboard_cache.get(key)
+    if cached is not None:
+        return cached
+    query = (
+        select(
+            MonthlyCostRollup.month_start,
+            MonthlyCostRollup.category,
+            func.sum(MonthlyCostRollup.amount_cents),
+            func.sum(MonthlyCostRollup.cost_count),
+        )
+        .where(
+            MonthlyCostRollup.month_start >= month_starts[0],
+            MonthlyCostRollup.month_start <= month_starts[-1],
+        )
+        .group_by(MonthlyCostRollup.month_start, MonthlyCostRollup.category)
+    )
+    if member_id is not None:
+        query = query.where(MonthlyCostRollup.member_id == member_id)
+    per_month = {
+        month_start: {"non_alcoholic": 0, "alcoholic": 0, "other": 0}
+        for month_start in month_starts
+    }
+    per_category: dict[str, int] = {}
+    count = 0
+    for month_start, category, amount_cents, cost_count in await session.exec(query):
+        per_month[month_start][CATEGORY_SERIES.get(category, "other")] += amount_cents
+        per_category[category] = per_category.get(category, 0) + amount_cents
+        count += cost_count
+    monthly: list[MonthlySpending] = [
+        {
+            "month": month_start.strftime("%m/%Y"),
+            **{series: from_cents(cents) for series, cents in amounts.items()},
+            "total": from_cents(sum(amounts.values())),
+        }
+        for month_start, amounts in per_month.items()
+    ]
+    categories: list[CategoryShare] = [
+        {
+            "series": CATEGORY_SERIES.get(category, "other"),
+            "name": category,
+            "value": from_cents(amount_cents),
+        }
+        for category, amount_cents in sorted(
+            per_category.items(), key=lambda item: -item[1]
+        )
+    ]
+    series: DashboardSeries = {
+        "monthly": monthly,
+        "categories": categories,
+        "total_cents": sum(per_category.values()),
+        "count": count,
+    }
+    _dashboard_cache[key] = series
+    return series
+
+
+async def invalidate_cost_summaries():
+    """Drop cached summaries after costs were added or removed."""
+    _summary_cache.clear()
+    _dashboard_cache.clear()
+    await bump_generation("costs")
@@ -0,0 +1,130 @@
+"""HTTP endpoints served next to the Reflex websocket.
+
+The bulk booking endpoint takes the taps queued by the offline mode of
+/tile-entry (assets/booking_queue.js). A batch is written in one
+transaction, and every booking carries a client-generated idempotency key,
+so a batch resent after a lost response is not booked twice.
+
+The cost export streams a CSV download, authorised by a short-lived export
+token rather than the session, see app.export.
+
+The health endpoint reports the wait statistics of the connection pool and
+the password hashing pool, for probes and for sizing the pools.
+"""
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from app.database import connection_wait_stats
+from app.export import COST_EXPORT_PATH, stream_costs_csv
+from app.member_directory import member_directory
+from app.models import QUICK_DRINKS, Cost, CurrentUser, to_cents
+from app.notifications import booking_notification
+from app.security import hashing_pool_stats, verify_export_token, verify_session_token
+from app.write_queue import Booking, write_bookings
+import datetime as dt
+
+BULK_BOOKING_PATH = "/api/bookings/bulk"
+BULK_BOOKING_MAX_BATCH = 500
+HEALTH_PATH = "/api/health"
+
+api = FastAPI()
+
+
+class QueuedBooking(BaseModel):
+    key: str = Field(min_length=1, max_length=64)
+    member_id: int
+    drink_type: str
+    date: dt.date | None = None
+
+
+class BulkBookingRequest(BaseModel):
+    bookings: list[QueuedBooking] = Field(max_length=BULK_BOOKING_MAX_BATCH)
+
+
+def _authenticated_user(authorization: str) -> CurrentUser:
+    user = verify_session_token(authorization.removeprefix("Bearer ").strip())
+    if user is None:
+        raise HTTPException(status_code=401, detail="Nicht angemeldet.")
+    return user
+
+
+@api.post(BULK_BOOKING_PATH)
+async def bulk_bookings(request: BulkBookingRequest, authorization: str = Header("")):
+    """Book queued drinks; every key gets a status: booked, duplicate or rejected.
+
+    Rejected bookings cannot succeed on a retry, so the client drops them
+    like the others. Only a failed request should be retried.
+    """
+    user = _authenticated_user(authorization)
+    member_ids = {member["id"] for member in await member_directory.members()}
+    today = dt.date.today()
+    bookings = []
+    # One status per queued booking, by position: a key repeated within
+    # the batch is booked once and reported as duplicate after that.
+    statuses = [None] * len(request.bookings)
+    positions = []
+    for position, queued in enumerate(request.bookings):
+        drink = QUICK_DRINKS.get(queued.drink_type)
+        if drink is None or queued.member_id not in member_ids:
+            statuses[position] = {
+                "key": queued.key,
+                "status": "rejected",
+                "error": "Unbekanntes Getränk oder Mitglied.",
+            }
+            continue
+        cost = Cost(
+            description=drink["description"],
+            amount_cents=to_cents(drink["amount"]),
+            # Taps queued before midnight keep their day; clocks ahead do not.
+            date=min(queued.date or today, today),
+            category=drink["category"],
+            member_id=queued.member_id,
+        )
+        notification = None
+        if user["id"] != queued.member_id:
+            notification = booking_notification(user, cost)
+        bookings.append(Booking(cost, notification, user["id"], queued.key))
+        positions.append(position)
+    results = await write_bookings(bookings) if bookings else []
+    for position, booking, result in zip(positions, bookings, results):
+        statuses[position] = {
+            "key": booking.key,
+            "status": "duplicate" if result.duplicate else "booked",
+            "cost_id": result.cost_id,
+        }
+    return {"results": statuses}
+
+
+@api.get(COST_EXPORT_PATH)
+async def export_costs(token: str = ""):
+    """Download the costs matching the filters of an export token as CSV."""
+    filters = verify_export_token(token)
+    if filters is None:
+        raise HTTPException(status_code=401, detail="Download-Link abgelaufen.")
+    start, end = (
+        dt.date.fromisoformat(filters[name]) if filters.get(name) else None
+        for name in ("start", "end")
+    )
+    filename = f"kosten-{dt.date.today().isoformat()}.csv"
+    return StreamingResponse(
+        stream_costs_csv(
+            start=start,
+            end=end,
+            member_id=filters.get("member_id"),
+            category=filters.get("category"),
+            name=filters.get("name"),
+        ),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@api.get(HEALTH_PATH)
+async def health():
+    """Liveness and the pool wait statistics since startup."""
+    return {
+        "status": "ok",
+        "db_connection_wait": connection_wait_stats.snapshot(),
+        "password_hashing": hashing_pool_stats.snapshot(),
+    }
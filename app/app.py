@@ -7,9 +7,12 @@ from app.pages.costs import costs_page
 from app.pages.all_costs import all_costs_page
 from app.pages.quick_entry import quick_entry_page
 from app.pages.tile_entry import tile_entry_page
+from app.pages.cost_import import cost_import_page
+from app.pages.dashboard import dashboard_page
 from app.states.auth_state import MyAuthState
 from app.states.notification_state import NotificationState
 from app.database import init_db
+from app.api import api
 
 init_db()
 app = rx.App(
@@ -22,6 +25,7 @@ app = rx.App(
             rel="stylesheet",
         ),
     ],
+    api_transformer=api,
 )
 app.add_page(index, route="/")
 app.add_page(login_page, route="/login")
@@ -30,4 +34,6 @@ app.add_page(profile_page, route="/profile")
 app.add_page(costs_page, route="/costs")
 app.add_page(all_costs_page, route="/all-costs")
 app.add_page(quick_entry_page, route="/quick-entry")
-app.add_page(tile_entry_page, route="/tile-entry")
\ No newline at end of file
+app.add_page(tile_entry_page, route="/tile-entry")
+app.add_page(cost_import_page, route="/import")
+app.add_page(dashboard_page, route="/dashboard")
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""Maintenance commands for the Kassen-App database.
+
+Usage: python -m app.cli <command> [options]
+"""
+
+import argparse
+from contextlib import ExitStack
+from app.aggregates import invalidate_cost_summaries
+from app.database import db_session, migrate_db
+from app.importer import ImportAborted, import_costs
+from app.member_directory import member_directory
+from app.notifications import NOTIFICATION_RETENTION_DAYS, prune_read_notifications
+from app.rollup import rebuild_rollup
+from app.seed import seed_synthetic_data, seed_test_data
+import asyncio
+import csv
+import datetime as dt
+import sys
+import time
+
+
+def rebuild_rollup_command(args: argparse.Namespace):
+    with db_session() as session:
+        rows = rebuild_rollup(session)
+        session.commit()
+    print(f"Rollups rebuilt: {rows} weekly rows.")
+
+
+async def _invalidate_seeded():
+    # Running apps reload the member list and summaries, see import_costs_command.
+    await member_directory.invalidate()
+    await invalidate_cost_summaries()
+
+
+def seed_command(args: argparse.Namespace):
+    with db_session() as session:
+        members, costs = seed_test_data(session, seed=args.seed)
+        session.commit()
+    asyncio.run(_invalidate_seeded())
+    print(f"Seeded {members} members and {costs} costs.")
+
+
+def seed_synthetic_command(args: argparse.Namespace):
+    started = time.perf_counter()
+    with db_session() as session:
+        members, costs = seed_synthetic_data(
+            session, args.members, args.costs, days=args.days, seed=args.seed
+        )
+        session.commit()
+    asyncio.run(_invalidate_seeded())
+    print(
+        f"Generated {members} members and {costs} costs "
+        f"in {time.perf_counter() - started:.1f} s."
+    )
+
+
+def prune_notifications_command(args: argparse.Namespace):
+    cutoff = dt.datetime.utcnow() - dt.timedelta(days=args.days)
+    with db_session() as session:
+        deleted = prune_read_notifications(session, cutoff)
+        session.commit()
+    print(f"Deleted {deleted} read notifications older than {args.days} days.")
+
+
+def import_costs_command(args: argparse.Namespace):
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        lines = stack.enter_context(open(args.file, newline="", encoding=args.encoding))
+        on_reject = None
+        if args.rejects:
+            rejects = csv.writer(
+                stack.enter_context(open(args.rejects, "w", newline=""))
+            )
+            rejects.writerow(["line", "reason"])
+            on_reject = lambda reject: rejects.writerow([reject.line, reject.reason])
+        session = stack.enter_context(db_session())
+        aborted = None
+        try:
+            result = import_costs(session, lines, on_reject)
+        except ImportAborted as error:
+            aborted = error
+            result = error.result
+    # Other processes drop their summary caches via Redis, or after the TTL.
+    asyncio.run(invalidate_cost_summaries())
+    print(
+        f"Imported {result.imported} costs, rejected {result.rejected} rows "
+        f"in {time.perf_counter() - started:.1f} s."
+    )
+    if not args.rejects:
+        for reject in result.rejects[:20]:
+            print(f"  line {reject.line}: {reject.reason}", file=sys.stderr)
+    if aborted:
+        sys.exit(str(aborted))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild = commands.add_parser(
+        "rebuild-rollup", help="Recompute the weekly cost rollup from all costs."
+    )
+    rebuild.set_defaults(handler=rebuild_rollup_command)
+    seed = commands.add_parser(
+        "seed", help="Add the demo admin, example and test members with costs."
+    )
+    seed.add_argument("--seed", type=int, default=0, help="Random seed.")
+    seed.set_defaults(handler=seed_command)
+    synthetic = commands.add_parser(
+        "seed-synthetic", help="Generate a large dataset for benchmarking."
+    )
+    synthetic.add_argument("--members", type=int, default=1_000)
+    synthetic.add_argument("--costs", type=int, default=1_000_000)
+    synthetic.add_argument(
+        "--days", type=int, default=365, help="Spread costs over this many days."
+    )
+    synthetic.add_argument("--seed", type=int, default=0, help="Random seed.")
+    synthetic.set_defaults(handler=seed_synthetic_command)
+    prune = commands.add_parser(
+        "prune-notifications", help="Delete old notifications that were read."
+    )
+    prune.add_argument(
+        "--days",
+        type=int,
+        default=NOTIFICATION_RETENTION_DAYS,
+        help="Keep read notifications younger than this many days.",
+    )
+    prune.set_defaults(handler=prune_notifications_command)
+    importer = commands.add_parser(
+        "import-costs", help="Import historical costs from a CSV file."
+    )
+    importer.add_argument(
+        "file", help="CSV with email, date, category, amount, description."
+    )
+    importer.add_argument("--rejects", help="Write rejected rows to this CSV file.")
+    importer.add_argument("--encoding", default="utf-8-sig")
+    importer.set_defaults(handler=import_costs_command)
+    return parser
+
+
+def main(argv: list[str] | None = None):
+    args = build_parser().parse_args(argv)
+    migrate_db()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -43,13 +43,18 @@ def navbar() -> rx.Component:
 def authenticated_nav() -> rx.Component:
     return rx.el.div(
         rx.cond(
-            MyAuthState.current_user.email != "acf@admin.com",
+            MyAuthState.current_user["email"] != "acf@admin.com",
             rx.el.a(
                 "Erstelle Kosten",
                 href="/costs",
                 class_name="text-sm font-medium text-gray-600 hover:text-violet-600 transition-colors",
             ),
         ),
+        rx.el.a(
+            "Dashboard",
+            href="/dashboard",
+            class_name="text-sm font-medium text-gray-600 hover:text-violet-600 transition-colors",
+        ),
         rx.el.a(
             "Alle Kosten",
             href="/all-costs",
@@ -65,6 +70,14 @@ def authenticated_nav() -> rx.Component:
             href="/tile-entry",
             class_name="text-sm font-medium text-gray-600 hover:text-violet-600 transition-colors",
         ),
+        rx.cond(
+            MyAuthState.current_user["email"] == "acf@admin.com",
+            rx.el.a(
+                "Import",
+                href="/import",
+                class_name="text-sm font-medium text-gray-600 hover:text-violet-600 transition-colors",
+            ),
+        ),
         rx.el.a(
             "Profil",
             href="/profile",
@@ -104,7 +117,7 @@ def mobile_menu() -> rx.Component:
             MyAuthState.is_authenticated,
             rx.el.div(
                 rx.cond(
-                    MyAuthState.current_user.email != "acf@admin.com",
+                    MyAuthState.current_user["email"] != "acf@admin.com",
                     rx.el.a(
                         "Erstelle Kosten",
                         href="/costs",
@@ -112,6 +125,12 @@ def mobile_menu() -> rx.Component:
                         on_click=UIState.close_mobile_menu,
                     ),
                 ),
+                rx.el.a(
+                    "Dashboard",
+                    href="/dashboard",
+                    class_name="block px-4 py-2 text-gray-700 hover:bg-gray-50",
+                    on_click=UIState.close_mobile_menu,
+                ),
                 rx.el.a(
                     "Alle Kosten",
                     href="/all-costs",
@@ -130,6 +149,15 @@ def mobile_menu() -> rx.Component:
                     class_name="block px-4 py-2 text-gray-700 hover:bg-gray-50",
                     on_click=UIState.close_mobile_menu,
                 ),
+                rx.cond(
+                    MyAuthState.current_user["email"] == "acf@admin.com",
+                    rx.el.a(
+                        "Import",
+                        href="/import",
+                        class_name="block px-4 py-2 text-gray-700 hover:bg-gray-50",
+                        on_click=UIState.close_mobile_menu,
+                    ),
+                ),
                 rx.el.a(
                     "Profil",
                     href="/profile",
@@ -206,6 +234,14 @@ def notification_dropdown() -> rx.Component:
                     class_name="p-4 text-sm text-gray-500",
                 ),
             ),
+            rx.cond(
+                NotificationState.has_more_notifications,
+                rx.el.button(
+                    "Mehr laden",
+                    on_click=NotificationState.load_more_notifications,
+                    class_name="w-full p-3 text-xs text-violet-600 hover:underline",
+                ),
+            ),
             class_name="max-h-80 overflow-y-auto divide-y",
         ),
         class_name="absolute right-0 mt-2 w-80 bg-white rounded-lg shadow-lg border z-50",
@@ -237,5 +273,8 @@ def main_layout(child: rx.Component) -> rx.Component:
             class_name="py-8",
         ),
         class_name="min-h-screen bg-gray-50 font-['Poppins']",
-        on_mount=NotificationState.load_notifications,
+        on_mount=[
+            NotificationState.load_notifications,
+            NotificationState.watch_notifications,
+        ],
     )
\ No newline at end of file
@@ -0,0 +1,28 @@
+import reflex as rx
+from app.journal import MAX_UNDO
+from app.states.quick_entry_state import QuickEntryState
+
+
+def undo_control() -> rx.Component:
+    """Undo the operator's last N bookings, N picked up to MAX_UNDO."""
+    return rx.el.div(
+        rx.el.select(
+            *[
+                rx.el.option(
+                    "Letzte Buchung" if count == 1 else f"Letzte {count} Buchungen",
+                    value=str(count),
+                )
+                for count in range(1, MAX_UNDO + 1)
+            ],
+            value=QuickEntryState.undo_count.to_string(),
+            on_change=QuickEntryState.set_undo_count,
+            class_name="px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm focus:outline-none focus:ring-violet-500 focus:border-violet-500",
+        ),
+        rx.el.button(
+            rx.icon("undo-2", size=16),
+            "Rückgängig",
+            on_click=QuickEntryState.undo_last_bookings(QuickEntryState.undo_count),
+            class_name="flex items-center gap-2 bg-red-100 text-red-600 text-sm font-medium px-4 py-2 rounded-md hover:bg-red-200 shadow-sm",
+        ),
+        class_name="flex items-center gap-2",
+    )
@@ -1,250 +1,192 @@
-from sqlmodel import create_engine, SQLModel, Session, select
-from contextlib import contextmanager
-from datetime import datetime, timedelta
-import bcrypt
-import random
-from app.models import Member, Cost, Notification
+from sqlmodel import create_engine, Session
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import Pool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from alembic import command
+from alembic.config import Config
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+import logging
+import threading
+import time
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///association.db")
-engine = create_engine(DATABASE_URL, echo=False)
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+BASELINE_REVISION = "0001"
+
+# Pragmas applied to every new SQLite connection. "production" lets the bar
+# tablets write while readers keep going (WAL) and makes writers wait for the
+# lock instead of failing with "database is locked". Every value can be
+# overridden with SQLITE_<PRAGMA>, e.g. SQLITE_BUSY_TIMEOUT=10000.
+SQLITE_PROFILES: dict[str, dict[str, str]] = {
+    "default": {},
+    "production": {
+        "journal_mode": "WAL",
+        "busy_timeout": "5000",
+        "synchronous": "NORMAL",
+        "mmap_size": str(256 * 1024 * 1024),
+        "cache_size": str(-64 * 1024),
+    },
+}
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_SLOW_ACQUIRE_MS = float(os.getenv("DB_SLOW_ACQUIRE_MS", "100"))
+
+
+def sqlite_pragmas(profile: str = DB_PROFILE) -> dict[str, str]:
+    """Return the pragmas of the given profile with environment overrides."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE: {profile}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    for name in SQLITE_PROFILES["production"]:
+        override = os.getenv(f"SQLITE_{name.upper()}")
+        if override:
+            pragmas[name] = override
+    return pragmas
+
+
+def _engine_kwargs(url: str) -> dict:
+    database = make_url(url).database
+    if url.startswith("sqlite") and (not database or database == ":memory:"):
+        # In-memory databases use a single shared connection, pool sizing does
+        # not apply.
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": not url.startswith("sqlite"),
+    }
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _async_database_url(url: str) -> str:
+    """Map DATABASE_URL onto the matching asyncio driver."""
+    parsed = make_url(url)
+    async_drivers = {
+        "sqlite": "sqlite+aiosqlite",
+        "postgresql": "postgresql+psycopg",
+        "postgresql+psycopg2": "postgresql+psycopg",
+    }
+    drivername = async_drivers.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_database_url(DATABASE_URL))
+
+engine = create_engine(DATABASE_URL, echo=False, **_engine_kwargs(DATABASE_URL))
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, echo=False, **_engine_kwargs(ASYNC_DATABASE_URL)
+)
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+if async_engine.dialect.name == "sqlite":
+    event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+SessionLocal = sessionmaker(bind=engine, class_=Session)
+# Attributes stay loaded after commit: lazy refreshes are not possible
+# outside of an awaited call.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+class ConnectionWaitStats:
+    """Running statistics on how long sessions wait for a pooled connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, waited_ms: float, pool: Pool):
+        """Count a wait; pool is the one the connection came from."""
+        with self._lock:
+            self.count += 1
+            self.total_ms += waited_ms
+            self.max_ms = max(self.max_ms, waited_ms)
+        if waited_ms >= DB_SLOW_ACQUIRE_MS:
+            logging.warning(
+                f"Waited {waited_ms:.1f} ms for a database connection "
+                f"({pool.status()})"
+            )
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "count": self.count,
+                "avg_ms": self.total_ms / self.count if self.count else 0.0,
+                "max_ms": self.max_ms,
+            }
+
+
+connection_wait_stats = ConnectionWaitStats()
 
 
 def init_db():
-    SQLModel.metadata.create_all(engine)
-    seed_test_data()
+    """Bring the schema up to date; demo data is seeded with app.cli seed."""
+    migrate_db()
+
+
+def migrate_db():
+    """Upgrade the database schema to the latest alembic revision.
+
+    Databases created before migrations were introduced already contain the
+    baseline tables, so they are stamped with the baseline revision first and
+    only receive the newer migrations.
+    """
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        tables = set(inspect(connection).get_table_names())
+        if "alembic_version" not in tables and "member" in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
 
 
 @contextmanager
 def db_session():
-    session = Session(engine)
+    session = SessionLocal()
     try:
+        started = time.perf_counter()
+        session.connection()
+        connection_wait_stats.record(
+            (time.perf_counter() - started) * 1000, engine.pool
+        )
         yield session
     finally:
         session.close()
 
 
-def seed_test_data():
-    with db_session() as session:
-        admin_user = session.exec(
-            select(Member).where(Member.email == "acf@admin.com")
-        ).first()
-        if not admin_user:
-            hashed_password = bcrypt.hashpw(
-                "admin123".encode("utf-8"), bcrypt.gensalt()
-            ).decode("utf-8")
-            admin_member = Member(
-                name="ACF Admin", email="acf@admin.com", password=hashed_password
-            )
-            session.add(admin_member)
-            session.commit()
-        alex_exists = session.exec(
-            select(Member).where(Member.email == "alex@example.com")
-        ).first()
-        if not alex_exists:
-            members_data = [
-                {
-                    "name": "Alex Example",
-                    "email": "alex@example.com",
-                    "password": "password123",
-                },
-                {
-                    "name": "Jamie Sample",
-                    "email": "jamie@example.com",
-                    "password": "secret456",
-                },
-                {
-                    "name": "Taylor Demo",
-                    "email": "taylor@example.com",
-                    "password": "demo789",
-                },
-            ]
-            created_members: list[Member] = []
-            for data in members_data:
-                hashed_password = bcrypt.hashpw(
-                    data["password"].encode("utf-8"), bcrypt.gensalt()
-                ).decode("utf-8")
-                member = Member(
-                    name=data["name"], email=data["email"], password=hashed_password
-                )
-                session.add(member)
-                created_members.append(member)
-            session.commit()
-            member_lookup: dict[str, Member] = {}
-            for member in created_members:
-                session.refresh(member)
-                member_lookup[member.email] = member
-            today = datetime.now().date()
-            costs_data = [
-                {
-                    "member_email": "alex@example.com",
-                    "description": "Club lemonade",
-                    "amount": 1.5,
-                    "days_ago": 1,
-                    "category": "Getränk (nicht-alkoholisch) - €1.50",
-                },
-                {
-                    "member_email": "alex@example.com",
-                    "description": "Team snacks",
-                    "amount": 8.75,
-                    "days_ago": 3,
-                    "category": "Snacks",
-                },
-                {
-                    "member_email": "jamie@example.com",
-                    "description": "Sparkling water",
-                    "amount": 2.5,
-                    "days_ago": 2,
-                    "category": "Getränk (alkoholisch) - €2.50",
-                },
-                {
-                    "member_email": "taylor@example.com",
-                    "description": "Reusable cups",
-                    "amount": 12.0,
-                    "days_ago": 6,
-                    "category": "Supplies",
-                },
-            ]
-            for cost_data in costs_data:
-                member = member_lookup.get(cost_data["member_email"])
-                if member is None:
-                    continue
-                cost = Cost(
-                    description=cost_data["description"],
-                    amount=cost_data["amount"],
-                    date=(today - timedelta(days=cost_data["days_ago"])).strftime(
-                        "%Y-%m-%d"
-                    ),
-                    category=cost_data["category"],
-                    member_id=member.id,
-                )
-                session.add(cost)
-            session.commit()
-        german_members = [
-            "Moritz Fuchs",
-            "Nina Schwarz",
-            "Thomas Schröder",
-            "Michael Schmitt",
-            "Sabrina Koch",
-            "Lukas Becker",
-            "Julia Richter",
-            "Kevin Klein",
-            "Laura Wolf",
-            "Daniel Neumann",
-            "Vanessa Schreiber",
-            "Fabian Zimmermann",
-            "Melanie Krüger",
-            "Sebastian Hoffmann",
-            "Tina Hartmann",
-            "Philipp Lange",
-            "Anna Werner",
-            "Marco Schmid",
-            "Lisa Krause",
-            "Patrick Meier",
-            "Sarah Lehmann",
-            "Tim Köhler",
-            "Michelle Huber",
-            "Florian Mayer",
-            "Jennifer Herrmann",
-            "Dominik König",
-            "Stephanie Schulze",
-            "Oliver Braun",
-            "Katharina Walter",
-            "Tobias Kraus",
-            "Christina Friedrich",
-            "Matthias Fischer",
-            "Sandra Schmitt",
-            "Andreas Weiß",
-            "Nadine Wagner",
-            "Mario Bauer",
-            "Tanja Roth",
-            "Christian Zimmermann",
-            "Franziska Schneider",
-            "Simon Peters",
-            "Daniela Müller",
-            "Felix Hoffmann",
-            "Jasmin Klein",
-            "Maximilian Berger",
-            "Melissa Weber",
-            "Nicolas Schwarz",
-            "Veronica Schäfer",
-            "David Becker",
-            "Simone Graf",
-            "Robert Vogel",
-        ]
-        common_password_hash = bcrypt.hashpw(
-            "test123".encode("utf-8"), bcrypt.gensalt()
-        ).decode("utf-8")
-        existing_emails = set(session.exec(select(Member.email)).all())
-        new_members_to_add = []
-        for i, name in enumerate(german_members, 1):
-            clean_name = (
-                name.lower()
-                .replace(" ", ".")
-                .replace("ä", "ae")
-                .replace("ö", "oe")
-                .replace("ü", "ue")
-                .replace("ß", "ss")
-            )
-            email = f"{clean_name}{i}@testverein.de"
-            if email not in existing_emails:
-                member = Member(name=name, email=email, password=common_password_hash)
-                new_members_to_add.append(member)
-                existing_emails.add(email)
-        if new_members_to_add:
-            for member in new_members_to_add:
-                session.add(member)
-            session.commit()
-        test_members = session.exec(
-            select(Member).where(Member.email.like("%@testverein.de"))
-        ).all()
-        other_descriptions = [
-            "Snacks",
-            "Supplies",
-            "Team Event",
-            "Equipment",
-            "Taxi",
-            "Büromaterial",
-            "Pizza",
-            "Dekoration",
-            "Vereinsfeier",
-            "Trikots",
-        ]
-        costs_to_add = []
-        for member in test_members:
-            existing_costs = session.exec(
-                select(Cost).where(Cost.member_id == member.id)
-            ).first()
-            if existing_costs:
-                continue
-            num_costs = random.randint(3, 8)
-            for _ in range(num_costs):
-                cat_type = random.choice(["non-alc", "alc", "other"])
-                if cat_type == "non-alc":
-                    category = "Getränke (nicht-alkoholisch) - €1.50"
-                    amount = 1.5
-                    description = "Nicht-alkoholisches Getränk"
-                elif cat_type == "alc":
-                    category = "Getränke (alkoholisch) - €2.50"
-                    amount = 2.5
-                    description = "Alkoholisches Getränk"
-                else:
-                    category = "Anderes"
-                    amount = round(random.uniform(5.0, 30.0), 2)
-                    description = random.choice(other_descriptions)
-                days_ago = random.randint(0, 30)
-                cost_date = (datetime.now() - timedelta(days=days_ago)).strftime(
-                    "%Y-%m-%d"
-                )
-                cost = Cost(
-                    description=description,
-                    amount=amount,
-                    date=cost_date,
-                    category=category,
-                    member_id=member.id,
-                )
-                costs_to_add.append(cost)
-        if costs_to_add:
-            for cost in costs_to_add:
-                session.add(cost)
-            session.commit()
\ No newline at end of file
+@asynccontextmanager
+async def async_db_session():
+    """Async counterpart of db_session() for event handlers.
+
+    Queries are awaited, so the event loop keeps serving other clients while
+    the database works.
+    """
+    session = AsyncSessionLocal()
+    try:
+        started = time.perf_counter()
+        await session.connection()
+        connection_wait_stats.record(
+            (time.perf_counter() - started) * 1000, async_engine.sync_engine.pool
+        )
+        yield session
+    finally:
+        await session.close()
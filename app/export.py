@@ -0,0 +1,100 @@
+"""Streaming CSV export of costs.
+
+Rows come from a server-side cursor EXPORT_CHUNK_ROWS at a time and each
+chunk is sent as soon as it is formatted, so memory stays flat however
+much history is exported. The query is awaited, so the event loop keeps
+serving other clients during a long download.
+
+The columns match what app.importer reads, so an export can be imported
+into another instance.
+"""
+
+import reflex as rx
+from typing import AsyncIterator
+from urllib.parse import urlencode
+from sqlmodel import select
+from app.database import async_db_session
+from app.models import Cost, Member, from_cents, member_name_contains
+from app.security import issue_export_token
+import csv
+import datetime as dt
+import io
+
+COST_EXPORT_PATH = "/api/costs/export.csv"
+EXPORT_CHUNK_ROWS = 2_000
+EXPORT_COLUMNS = ("date", "email", "name", "category", "amount", "description")
+
+
+def export_url(user_id: int, **filters) -> str:
+    """Short-lived download link for the export; empty filters are left out.
+
+    A link cannot send headers. It carries an export token with the filters
+    instead of the session token, see app.security.issue_export_token.
+    """
+    filters = {name: value for name, value in filters.items() if value}
+    return (
+        rx.config.get_config().api_url.rstrip("/")
+        + COST_EXPORT_PATH
+        + "?"
+        + urlencode({"token": issue_export_token(user_id, filters)})
+    )
+
+
+def export_query(
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+    member_id: int | None = None,
+    category: str | None = None,
+    name: str | None = None,
+):
+    """Costs in [start, end] of the member and category, oldest first.
+
+    name narrows the costs to members whose name contains it, like the
+    search on /all-costs.
+    """
+    query = select(
+        Cost.date,
+        Member.email,
+        Member.name,
+        Cost.category,
+        Cost.amount_cents,
+        Cost.description,
+    ).join(Member, Cost.member_id == Member.id)
+    if start is not None:
+        query = query.where(Cost.date >= start)
+    if end is not None:
+        query = query.where(Cost.date <= end)
+    if member_id is not None:
+        query = query.where(Cost.member_id == member_id)
+    if category:
+        query = query.where(Cost.category == category)
+    if name:
+        query = query.where(member_name_contains(name))
+    return query.order_by(Cost.date, Cost.id)
+
+
+async def stream_costs_csv(**filters) -> AsyncIterator[str]:
+    """Yield the CSV of the filtered costs, one chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    # The BOM makes Excel read the umlauts as UTF-8; the importer skips it.
+    yield "\ufeff" + buffer.getvalue()
+    query = export_query(**filters).execution_options(yield_per=EXPORT_CHUNK_ROWS)
+    async with async_db_session() as session:
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                (
+                    date.isoformat(),
+                    email,
+                    name,
+                    category,
+                    f"{from_cents(amount_cents):.2f}",
+                    description or "",
+                )
+                for date, email, name, category, amount_cents, description in rows
+            )
+            yield buffer.getvalue()
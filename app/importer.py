@@ -0,0 +1,171 @@
+"""Streaming CSV import of historical costs.
+
+The file is read row by row and written IMPORT_BATCH_SIZE rows at a time:
+one executemany insert plus executemany upserts of the weekly and monthly
+rollups, committed per batch. Memory stays flat however long the file is;
+only the member lookup and the first MAX_REPORTED_REJECTS rejects are kept.
+
+Expected columns (header row required, extra columns are ignored):
+email, date, category, amount, description, separated by commas or
+semicolons. Dates are ISO (2024-05-31) or German (31.05.2024). Amounts may
+use a decimal comma and may be left empty for categories with a fixed
+price, which must match when given.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import chain
+from typing import Callable, Iterable
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from app.models import QUICK_DRINKS, Cost, Member, to_cents
+from app.rollup import rollup_deltas, rollup_upsert
+import csv
+import datetime as dt
+
+IMPORT_BATCH_SIZE = 5_000
+MAX_REPORTED_REJECTS = 1_000
+REQUIRED_COLUMNS = ("email", "date", "category")
+
+# Price per category, None for free amounts, as on the cost forms.
+COST_CATEGORIES: dict[str, float | None] = {
+    **{drink["category"]: drink["amount"] for drink in QUICK_DRINKS.values()},
+    "Anderes": None,
+}
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportReject:
+    line: int
+    reason: str
+
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    rejected: int = 0
+    # Only the first MAX_REPORTED_REJECTS, see on_reject for all of them.
+    rejects: list[ImportReject] = field(default_factory=list)
+
+
+class ImportAborted(Exception):
+    """The import stopped early; the lines before `line` were committed."""
+
+    def __init__(self, result: ImportResult, line: int, error: Exception):
+        super().__init__(f"Import ab Zeile {line} abgebrochen: {error}")
+        self.result = result
+        self.line = line
+
+
+def parse_date(text: str) -> dt.date:
+    text = text.strip()
+    try:
+        if "." in text:
+            return dt.datetime.strptime(text, "%d.%m.%Y").date()
+        return dt.date.fromisoformat(text)
+    except ValueError:
+        raise ImportRowError(f"Ungültiges Datum: {text!r}")
+
+
+def parse_amount_cents(category: str, text: str) -> int:
+    if category not in COST_CATEGORIES:
+        raise ImportRowError(f"Unbekannte Kategorie: {category!r}")
+    price = COST_CATEGORIES[category]
+    text = text.strip().replace("€", "").replace(",", ".")
+    if not text:
+        if price is None:
+            raise ImportRowError("Betrag fehlt.")
+        return to_cents(price)
+    try:
+        amount_cents = to_cents(Decimal(text))
+    except (InvalidOperation, ValueError):
+        raise ImportRowError(f"Ungültiger Betrag: {text!r}")
+    if amount_cents <= 0:
+        raise ImportRowError("Betrag muss positiv sein.")
+    if price is not None and amount_cents != to_cents(price):
+        raise ImportRowError(f"Betrag weicht vom Preis {price:.2f} ab.")
+    return amount_cents
+
+
+def _write_batch(session: Session, rows: list[dict]):
+    session.exec(insert(Cost), params=rows)
+    dialect_name = session.bind.dialect.name
+    for rollup, rollup_rows in rollup_deltas(
+        (row["date"], row["member_id"], row["category"], 1, row["amount_cents"])
+        for row in rows
+    ):
+        session.exec(rollup_upsert(dialect_name, rollup), params=rollup_rows)
+    session.commit()
+
+
+def import_costs(
+    session: Session,
+    lines: Iterable[str],
+    on_reject: Callable[[ImportReject], None] | None = None,
+) -> ImportResult:
+    """Validate and insert the costs in a CSV, committing every batch.
+
+    Rows that fail validation are skipped and reported, the rest are
+    imported. A rejected file header raises ImportRowError before any
+    row is written; any later failure (a malformed file, a failed commit)
+    raises ImportAborted with what was committed up to then.
+    """
+    lines = iter(lines)
+    first = next(lines, "")
+    # Spreadsheets in German locales export with semicolons.
+    delimiter = ";" if first.count(";") > first.count(",") else ","
+    reader = csv.DictReader(chain([first], lines), delimiter=delimiter)
+    header = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ImportRowError(f"Spalten fehlen: {', '.join(missing)}")
+    reader.fieldnames = header
+    member_ids = {
+        email.lower(): member_id
+        for member_id, email in session.exec(select(Member.id, Member.email))
+    }
+    result = ImportResult()
+    batch: list[dict] = []
+    committed_line = reader.line_num
+    try:
+        for row in reader:
+            try:
+                email = (row["email"] or "").strip().lower()
+                if email not in member_ids:
+                    raise ImportRowError(f"Unbekanntes Mitglied: {email!r}")
+                category = (row["category"] or "").strip()
+                batch.append(
+                    {
+                        "member_id": member_ids[email],
+                        "date": parse_date(row["date"] or ""),
+                        "category": category,
+                        "amount_cents": parse_amount_cents(
+                            category, row.get("amount") or ""
+                        ),
+                        "description": (row.get("description") or "").strip() or None,
+                    }
+                )
+            except ImportRowError as error:
+                reject = ImportReject(reader.line_num, str(error))
+                result.rejected += 1
+                if len(result.rejects) < MAX_REPORTED_REJECTS:
+                    result.rejects.append(reject)
+                if on_reject:
+                    on_reject(reject)
+                continue
+            if len(batch) == IMPORT_BATCH_SIZE:
+                _write_batch(session, batch)
+                result.imported += len(batch)
+                committed_line = reader.line_num
+                batch = []
+        if batch:
+            _write_batch(session, batch)
+            result.imported += len(batch)
+    except Exception as error:
+        session.rollback()
+        raise ImportAborted(result, committed_line + 1, error) from error
+    return result
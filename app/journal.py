@@ -0,0 +1,87 @@
+"""Booking journal: idempotent retries and multi-level undo.
+
+Every booking from the entry pages is journaled with the operator who made
+it and, when the client sent one, an idempotency key. A tap that reaches
+the server twice (a double tap before the page updated, or a resend after
+a reconnect) carries the same key and gets the first booking's result
+back instead of a second cost. Undo walks the operator's journal backwards
+and marks the entries it reverted, so the journal itself is never edited
+away. Only the last MAX_UNDO bookings of the past UNDO_WINDOW_MINUTES can
+be undone; older ones are settled.
+
+SQLite reuses the id of a deleted cost, so deleting a journaled cost on
+/costs settles its entries: a later undo must not delete whichever cost
+took over the id.
+"""
+
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import BookingJournal, Cost, Notification
+from app.notifications import remove_booking
+from app.rollup import record_cost
+from datetime import datetime, timedelta
+import os
+
+MAX_UNDO = 10
+UNDO_WINDOW_MINUTES = float(os.getenv("UNDO_WINDOW_MINUTES", "60"))
+
+
+async def journal_entries(
+    session: AsyncSession, keys: list[str]
+) -> dict[str, BookingJournal]:
+    """The journaled bookings for the given idempotency keys, by key."""
+    if not keys:
+        return {}
+    entries = await session.exec(
+        select(BookingJournal).where(BookingJournal.idempotency_key.in_(keys))
+    )
+    return {entry.idempotency_key: entry for entry in entries}
+
+
+async def settle_cost(session: AsyncSession, cost_id: int):
+    """Take the cost's journal entries out of undo, in the caller's transaction."""
+    await session.exec(
+        update(BookingJournal)
+        .where(BookingJournal.cost_id == cost_id, BookingJournal.undone_at == None)
+        .values(undone_at=datetime.utcnow())
+    )
+
+
+async def undo_bookings(
+    session: AsyncSession, operator_id: int, count: int
+) -> list[BookingJournal]:
+    """Revert the operator's last `count` bookings that are not undone yet.
+
+    count is clamped to 1..MAX_UNDO and bookings older than
+    UNDO_WINDOW_MINUTES are left alone. Costs, rollup and notifications
+    are reverted in the caller's transaction. Returns the reverted
+    entries, newest first.
+    """
+    count = min(max(count, 1), MAX_UNDO)
+    cutoff = datetime.utcnow() - timedelta(minutes=UNDO_WINDOW_MINUTES)
+    entries = (
+        await session.exec(
+            select(BookingJournal)
+            .where(
+                BookingJournal.operator_id == operator_id,
+                BookingJournal.undone_at == None,
+                BookingJournal.created_at >= cutoff,
+            )
+            .order_by(BookingJournal.id.desc())
+            .limit(count)
+        )
+    ).all()
+    undone_at = datetime.utcnow()
+    for entry in entries:
+        cost = await session.get(Cost, entry.cost_id)
+        # A cost deleted outside of settle_cost may have lost its id to another.
+        if cost and cost.member_id == entry.member_id:
+            await session.delete(cost)
+            await record_cost(session, cost, sign=-1)
+            if entry.notification_id:
+                notification = await session.get(Notification, entry.notification_id)
+                if notification:
+                    await remove_booking(session, notification, cost)
+        entry.undone_at = undone_at
+        session.add(entry)
+    return list(entries)
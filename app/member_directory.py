@@ -0,0 +1,86 @@
+"""Process-wide member directory for the quick-entry and tile pages.
+
+Every client mounting /quick-entry or /tile-entry needs the same member
+list, and it only changes when someone registers. The directory loads it
+once per process and is patched by the code that adds or changes members,
+so later page loads are served from memory. Changes made by another
+backend worker bump the shared "members" generation and trigger a reload.
+"""
+
+from bisect import insort
+from sqlmodel import select
+from app.database import async_db_session
+from app.member_search import MemberSearchIndex
+from app.models import Member, MemberEntry, member_entry
+from app.shared_cache import bump_generation, generation
+import asyncio
+
+HIDDEN_EMAILS = {"acf@admin.com"}
+
+
+class MemberDirectory:
+    """Member entries ordered by sort key, excluding the shared admin account."""
+
+    def __init__(self):
+        self._members: list[MemberEntry] | None = None
+        self._generation = 0
+        self._index = MemberSearchIndex()
+        self._lock = asyncio.Lock()
+
+    async def members(self) -> list[MemberEntry]:
+        current = await generation("members")
+        if self._members is None or self._generation != current:
+            async with self._lock:
+                if self._members is None or self._generation != current:
+                    async with async_db_session() as session:
+                        rows = await session.exec(
+                            select(Member).where(Member.email.not_in(HIDDEN_EMAILS))
+                        )
+                        members = sorted(
+                            (member_entry(member) for member in rows),
+                            key=lambda entry: entry["sort_key"],
+                        )
+                    self._index = MemberSearchIndex()
+                    for entry in members:
+                        self._index.add(entry)
+                    self._members = members
+                    self._generation = current
+        return self._members
+
+    @property
+    def generation(self) -> int:
+        """Generation of the loaded list; it changes whenever the list does."""
+        return self._generation
+
+    async def upsert(self, member: Member):
+        """Add a new member or replace the entry of a changed one."""
+        if member.email in HIDDEN_EMAILS:
+            return
+        current = await bump_generation("members")
+        if self._members is None or current != self._generation + 1:
+            # Not loaded yet, or another worker changed members as well.
+            self._members = None
+            return
+        self._generation = current
+        entry = member_entry(member)
+        members = [known for known in self._members if known["id"] != member.id]
+        insort(members, entry, key=lambda known: known["sort_key"])
+        self._index.add(entry)
+        # Swap the list rather than mutating it, sessions may hold the old one.
+        self._members = members
+
+    async def search(self, query: str) -> list[int]:
+        """Ranked ids of the members matching the query, see app.member_search.
+
+        Loads the directory first, so the index is current in this worker.
+        """
+        await self.members()
+        return self._index.search(query)
+
+    async def invalidate(self):
+        """Reload from the database on the next request, in every worker."""
+        self._members = None
+        await bump_generation("members")
+
+
+member_directory = MemberDirectory()
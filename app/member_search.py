@@ -0,0 +1,133 @@
+"""Search index over member names for the tile and quick-entry pages.
+
+Names and queries are folded the same way, so "schroder", "schroeder" and
+"Schröder" all meet at "schroder" and "weiss" finds "Weiß". Matches are
+ranked in three tiers: every query word is a prefix of a name word, the
+query occurs somewhere in the name, or the name shares enough trigrams
+with the query to be a likely typo.
+"""
+
+from collections import Counter, defaultdict
+from itertools import chain
+from app.models import MemberEntry
+import unicodedata
+
+# Share of the query's trigrams a name must contain to count as a fuzzy match.
+MIN_TRIGRAM_SHARE = 0.6
+
+
+def fold(text: str) -> str:
+    """Lowercase, spell out ß and strip accents and umlauts (ä, ae -> a)."""
+    text = text.casefold().replace("ß", "ss")
+    text = "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+    return text.replace("ae", "a").replace("oe", "o").replace("ue", "u")
+
+
+def trigrams(text: str) -> set[str]:
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def inner_trigrams(text: str) -> set[str]:
+    """Unpadded trigrams of the whole text, spaces between words included."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class MemberSearchIndex:
+    """Prefix and trigram postings for folded member names."""
+
+    def __init__(self):
+        self._names: dict[int, str] = {}
+        self._sort_keys: dict[int, str] = {}
+        self._trigrams: dict[int, set[str]] = {}
+        self._by_prefix: dict[str, set[int]] = defaultdict(set)
+        self._by_trigram: dict[str, set[int]] = defaultdict(set)
+
+    def add(self, entry: MemberEntry):
+        member_id = entry["id"]
+        self.remove(member_id)
+        name = " ".join(fold(entry["name"]).split())
+        self._names[member_id] = name
+        self._sort_keys[member_id] = entry["sort_key"]
+        # Whole-name trigrams let a substring span words ("na schw").
+        self._trigrams[member_id] = trigrams(name) | inner_trigrams(name)
+        for word in name.split():
+            for end in range(1, len(word) + 1):
+                self._by_prefix[word[:end]].add(member_id)
+        for gram in self._trigrams[member_id]:
+            self._by_trigram[gram].add(member_id)
+
+    def remove(self, member_id: int):
+        name = self._names.pop(member_id, None)
+        if name is None:
+            return
+        del self._sort_keys[member_id]
+        for word in name.split():
+            for end in range(1, len(word) + 1):
+                self._discard(self._by_prefix, word[:end], member_id)
+        for gram in self._trigrams.pop(member_id):
+            self._discard(self._by_trigram, gram, member_id)
+
+    @staticmethod
+    def _discard(postings: dict[str, set[int]], key: str, member_id: int):
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(member_id)
+            if not ids:
+                del postings[key]
+
+    def search(self, query: str) -> list[int]:
+        """Ids of the members matching the query, best matches first."""
+        words = fold(query).split()
+        if not words:
+            return []
+        folded = " ".join(words)
+        by_name = self._sort_keys.__getitem__
+        prefix_hits = set.intersection(
+            *(self._by_prefix.get(word, set()) for word in words)
+        )
+        # Matching from the first name word on ranks above a surname hit.
+        from_start = {
+            member_id
+            for member_id in prefix_hits
+            if self._names[member_id].startswith(words[0])
+        }
+        ranked = sorted(from_start, key=by_name) + sorted(
+            prefix_hits - from_start, key=by_name
+        )
+        if len(folded) < 3:
+            return ranked
+        # Substrings: names containing every unpadded trigram of the query.
+        inner = sorted(
+            (self._by_trigram.get(gram, set()) for gram in inner_trigrams(folded)),
+            key=len,
+        )
+        substring_hits = {
+            member_id
+            for member_id in set.intersection(*inner) - prefix_hits
+            if folded in self._names[member_id]
+        }
+        ranked += sorted(substring_hits, key=by_name)
+        query_grams = trigrams(folded)
+        needed = MIN_TRIGRAM_SHARE * len(query_grams)
+        shared = Counter(
+            chain.from_iterable(self._by_trigram.get(gram, ()) for gram in query_grams)
+        )
+        fuzzy_hits = [
+            member_id
+            for member_id, count in shared.items()
+            if count >= needed
+            and member_id not in prefix_hits
+            and member_id not in substring_hits
+        ]
+        ranked += sorted(
+            fuzzy_hits, key=lambda member_id: (-shared[member_id], by_name(member_id))
+        )
+        return ranked
@@ -1,7 +1,10 @@
 import reflex as rx
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 from typing import TypedDict, Optional
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+import datetime as dt
 
 
 class Member(SQLModel, table=True):
@@ -12,32 +15,179 @@ class Member(SQLModel, table=True):
 
 
 class Cost(SQLModel, table=True):
+    __table_args__ = (Index("ix_cost_member_id_date", "member_id", "date"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     description: Optional[str]
-    amount: float
-    date: str
+    amount_cents: int
+    date: dt.date = Field(index=True)
     category: str
     member_id: int = Field(foreign_key="member.id")
 
 
+class WeeklyCostRollup(SQLModel, table=True):
+    """Cost count and sum per week, member and category.
+
+    Maintained in the same transaction as every cost insert or delete, see
+    app/rollup.py.
+    """
+
+    __tablename__ = "weekly_cost_rollup"
+
+    week_start: dt.date = Field(primary_key=True)
+    member_id: int = Field(foreign_key="member.id", primary_key=True)
+    category: str = Field(primary_key=True)
+    cost_count: int = 0
+    amount_cents: int = 0
+
+
+class MonthlyCostRollup(SQLModel, table=True):
+    """Cost count and sum per month, member and category.
+
+    Kept in step with WeeklyCostRollup by app/rollup.py; weeks cross month
+    ends, so the monthly figures cannot be summed from the weekly rows.
+    """
+
+    __tablename__ = "monthly_cost_rollup"
+
+    month_start: dt.date = Field(primary_key=True)
+    member_id: int = Field(foreign_key="member.id", primary_key=True)
+    category: str = Field(primary_key=True)
+    cost_count: int = 0
+    amount_cents: int = 0
+
+
+class NotificationCounter(SQLModel, table=True):
+    """Unread notifications per member, kept in step by app/notifications.py."""
+
+    __tablename__ = "notification_counter"
+
+    member_id: int = Field(foreign_key="member.id", primary_key=True)
+    unread_count: int = 0
+
+
 class Notification(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_notification_member_id_created_at", "member_id", "created_at"),
+        Index(
+            "ix_notification_member_id_is_read_created_at",
+            "member_id",
+            "is_read",
+            "created_at",
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     member_id: int = Field(foreign_key="member.id")
     message: str
     is_read: bool = Field(default=False)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bookings by actor_id for member_id, coalesced by app/notifications.py.
+    actor_id: Optional[int] = Field(default=None, foreign_key="member.id")
+    kind: str = "costs"
+    booking_count: int = 1
+    amount_cents: int = 0
+
+
+class BookingJournal(SQLModel, table=True):
+    """Append-only log of the bookings made from the entry pages.
+
+    Retried taps carry the same idempotency key and are answered from the
+    journal; undo marks entries instead of deleting them, see app/journal.py.
+    """
+
+    __tablename__ = "booking_journal"
+    __table_args__ = (Index("ix_booking_journal_operator_id_id", "operator_id", "id"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    idempotency_key: Optional[str] = Field(default=None, unique=True, index=True)
+    operator_id: int = Field(foreign_key="member.id")
+    member_id: int = Field(foreign_key="member.id")
+    cost_id: int = Field(index=True)
+    notification_id: Optional[int] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    undone_at: Optional[datetime] = None
 
 
 class CostWithMember(TypedDict):
     id: int
     description: str
     amount: float
+    amount_cents: int
     date: str
+    week_start: str
     category: str
     member_id: int
     member_name: str
 
 
+class MemberEntry(TypedDict):
+    id: int
+    name: str
+    first_name: str
+    initials: str
+    sort_key: str
+
+
+class CurrentUser(TypedDict):
+    id: int
+    name: str
+    email: str
+
+
+ANONYMOUS_USER: CurrentUser = {"id": 0, "name": "", "email": ""}
+
+
+class CostSummary(TypedDict):
+    total_cents: int
+    count: int
+    members: int
+
+
+class MonthlySpending(TypedDict):
+    """One month of the dashboard trend, amounts in euros per series."""
+
+    month: str
+    non_alcoholic: float
+    alcoholic: float
+    other: float
+    total: float
+
+
+class CategoryShare(TypedDict):
+    series: str
+    name: str
+    value: float
+
+
+class DashboardSeries(TypedDict):
+    monthly: list[MonthlySpending]
+    categories: list[CategoryShare]
+    total_cents: int
+    count: int
+
+
+class QuickDrink(TypedDict):
+    category: str
+    amount: float
+    description: str
+
+
+# The one-tap drinks on the entry pages and the bulk booking endpoint.
+QUICK_DRINKS: dict[str, QuickDrink] = {
+    "non-alcoholic": {
+        "category": "Getränke (nicht-alkoholisch) - €1.50",
+        "amount": 1.5,
+        "description": "Nicht-alkoholisches Getränk",
+    },
+    "alcoholic": {
+        "category": "Getränke (alkoholisch) - €2.50",
+        "amount": 2.5,
+        "description": "Alkoholisches Getränk",
+    },
+}
+
+
 class RegisterForm(TypedDict):
     name: str
     email: str
@@ -53,4 +203,63 @@ class CostForm(TypedDict):
     description: Optional[str]
     amount: Optional[str]
     date: str
-    category: str
\ No newline at end of file
+    category: str
+
+
+def to_cents(amount: float | str) -> int:
+    """Convert a euro amount to integer cents, rounding half up."""
+    value = Decimal(str(amount))
+    if not value.is_finite():
+        raise ValueError(f"Invalid amount: {amount}")
+    return int((value * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> float:
+    """Convert integer cents back to a euro amount for display."""
+    return cents / 100
+
+
+def week_start_of(day: dt.date) -> dt.date:
+    """Return the Monday of the week containing the given day."""
+    return day - dt.timedelta(days=day.weekday())
+
+
+def month_start_of(day: dt.date) -> dt.date:
+    """Return the first day of the month containing the given day."""
+    return day.replace(day=1)
+
+
+def serialize_cost(cost: Cost) -> dict:
+    """Convert a cost row into the dict shape rendered by the cost tables."""
+    return {
+        "id": cost.id,
+        "description": cost.description,
+        "amount": from_cents(cost.amount_cents),
+        "amount_cents": cost.amount_cents,
+        "date": cost.date.isoformat(),
+        "category": cost.category,
+        "member_id": cost.member_id,
+    }
+
+
+def member_entry(member: Member) -> MemberEntry:
+    """The slice of a member the member lists and tiles render."""
+    parts = member.name.split()
+    return {
+        "id": member.id,
+        "name": member.name,
+        "first_name": parts[0] if parts else "",
+        "initials": "".join(part[0] for part in parts[:2]).upper(),
+        "sort_key": member.name.casefold(),
+    }
+
+
+def current_user_of(member: Member) -> CurrentUser:
+    """The logged-in member as kept in client state, without the hash."""
+    return {"id": member.id, "name": member.name, "email": member.email}
+
+
+def member_name_contains(query: str):
+    """Filter on members whose name contains the query; % and _ match literally."""
+    pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return Member.name.ilike(f"%{pattern}%", escape="\\")
@@ -0,0 +1,291 @@
+"""Unread counters and live delivery for member notifications.
+
+Every write that creates, deletes or reads notifications adjusts the
+member's row in notification_counter in the same transaction, so the bell
+badge is one primary-key lookup however many notifications pile up. After
+the commit the writer calls notify(), which wakes the open sessions of the
+affected members so they fetch what is new instead of polling.
+
+Bookings someone makes for another member are coalesced: while the
+member has not read it, a notification keeps collecting the actor's
+bookings that follow within NOTIFICATION_COALESCE_MINUTES of each other,
+so a round of drinks becomes "Anna hat 3 Getränke (€7.50) für dich
+hinzugefügt." instead of three rows.
+"""
+
+from collections import Counter, defaultdict
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import (
+    Cost,
+    CurrentUser,
+    Member,
+    Notification,
+    NotificationCounter,
+    from_cents,
+)
+from app.shared_cache import REDIS_URL, publish, subscribe
+import asyncio
+import datetime as dt
+import logging
+import os
+
+# Read notifications older than this are removed by prune_read_notifications.
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+NOTIFICATION_COALESCE_MINUTES = float(os.getenv("NOTIFICATION_COALESCE_MINUTES", "10"))
+
+
+def counter_statement(dialect_name: str, member_id: int, delta: int):
+    """Upsert adding delta to a member's unread count."""
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    upsert = insert(NotificationCounter).values(
+        member_id=member_id, unread_count=max(delta, 0)
+    )
+    return upsert.on_conflict_do_update(
+        index_elements=["member_id"],
+        set_={"unread_count": NotificationCounter.unread_count + delta},
+    )
+
+
+async def count_unread(
+    session: AsyncSession, notifications: list[Notification], sign: int = 1
+):
+    """Add (sign=1) or remove (sign=-1) unread notifications from the counters.
+
+    Call before committing the session that inserts or deletes them.
+    """
+    per_member = Counter(
+        notification.member_id
+        for notification in notifications
+        if not notification.is_read
+    )
+    for member_id, count in per_member.items():
+        await session.exec(
+            counter_statement(session.bind.dialect.name, member_id, sign * count)
+        )
+
+
+def booking_message(
+    actor_name: str, kind: str, count: int, amount_cents: int, description: str
+) -> str:
+    amount = from_cents(amount_cents)
+    if count > 1:
+        noun = "Getränke" if kind == "drinks" else "Buchungen"
+        return f"{actor_name} hat {count} {noun} (€{amount:.2f}) für dich hinzugefügt."
+    if kind == "drinks" and description:
+        return f"{actor_name} hat ein '{description}' für dich hinzugefügt."
+    if kind == "drinks":
+        return f"{actor_name} hat ein Getränk (€{amount:.2f}) für dich hinzugefügt."
+    return f"{actor_name} hat Kosten (€{amount:.2f}) für dich hinzugefügt."
+
+
+def booking_notification(actor: CurrentUser, cost: Cost) -> Notification:
+    """The notification telling cost.member_id that the actor booked a cost."""
+    kind = "drinks" if cost.category.startswith("Getränke") else "costs"
+    return Notification(
+        member_id=cost.member_id,
+        actor_id=actor["id"],
+        kind=kind,
+        amount_cents=cost.amount_cents,
+        message=booking_message(
+            actor["name"], kind, 1, cost.amount_cents, cost.description or ""
+        ),
+    )
+
+
+async def _open_booking_notification(
+    session: AsyncSession, member_id: int, actor_id: int
+) -> Notification | None:
+    cutoff = dt.datetime.utcnow() - dt.timedelta(minutes=NOTIFICATION_COALESCE_MINUTES)
+    return (
+        await session.exec(
+            select(Notification)
+            .where(
+                Notification.member_id == member_id,
+                Notification.is_read == False,
+                Notification.actor_id == actor_id,
+                Notification.created_at >= cutoff,
+            )
+            .order_by(Notification.created_at.desc())
+            .limit(1)
+        )
+    ).first()
+
+
+async def add_notifications(
+    session: AsyncSession, notifications: list[Notification]
+) -> list[Notification]:
+    """Add notifications, merging bookings into the actor's open notification.
+
+    Returns the row each notification ended up in, in order, and updates
+    the counters for the rows that are new. The caller commits.
+    """
+    open_rows: dict[tuple[int, int], Notification | None] = {}
+    added = []
+    targets = []
+    for notification in notifications:
+        key = (notification.member_id, notification.actor_id)
+        target = None
+        if notification.actor_id is not None:
+            if key not in open_rows:
+                open_rows[key] = await _open_booking_notification(session, *key)
+            target = open_rows[key]
+        if target is None:
+            session.add(notification)
+            added.append(notification)
+            target = notification
+            if notification.actor_id is not None:
+                open_rows[key] = notification
+        else:
+            actor = await session.get(Member, notification.actor_id)
+            target.booking_count += notification.booking_count
+            target.amount_cents += notification.amount_cents
+            if target.kind != notification.kind:
+                target.kind = "costs"
+            target.created_at = notification.created_at
+            target.message = booking_message(
+                actor.name, target.kind, target.booking_count, target.amount_cents, ""
+            )
+            session.add(target)
+        targets.append(target)
+    await count_unread(session, added)
+    return targets
+
+
+async def remove_booking(session: AsyncSession, notification: Notification, cost: Cost):
+    """Take an undone booking out of its notification, deleting it if last."""
+    if notification.booking_count <= 1:
+        await session.delete(notification)
+        await count_unread(session, [notification], sign=-1)
+        return
+    notification.booking_count -= 1
+    notification.amount_cents -= cost.amount_cents
+    actor = await session.get(Member, notification.actor_id)
+    notification.message = booking_message(
+        actor.name,
+        notification.kind,
+        notification.booking_count,
+        notification.amount_cents,
+        "",
+    )
+    session.add(notification)
+
+
+async def mark_read(session: AsyncSession, member_id: int, notification_id: int):
+    """Mark one of the member's notifications read; False if it already was.
+
+    A single conditional UPDATE, so two clicks cannot both decrement.
+    """
+    result = await session.exec(
+        update(Notification)
+        .where(
+            Notification.id == notification_id,
+            Notification.member_id == member_id,
+            Notification.is_read == False,
+        )
+        .values(is_read=True)
+    )
+    if not result.rowcount:
+        return False
+    await session.exec(counter_statement(session.bind.dialect.name, member_id, -1))
+    return True
+
+
+async def mark_all_read(session: AsyncSession, member_id: int):
+    """Mark all of the member's notifications read and zero the counter."""
+    await session.exec(
+        update(Notification)
+        .where(Notification.member_id == member_id, Notification.is_read == False)
+        .values(is_read=True)
+    )
+    await session.exec(
+        update(NotificationCounter)
+        .where(NotificationCounter.member_id == member_id)
+        .values(unread_count=0)
+    )
+
+
+def prune_read_notifications(session: Session, older_than: dt.datetime) -> int:
+    """Delete read notifications created before older_than.
+
+    Unread ones are kept whatever their age, so the counters stay valid.
+    Returns the number of deleted rows. The caller commits.
+    """
+    result = session.exec(
+        delete(Notification).where(
+            Notification.is_read == True, Notification.created_at < older_than
+        )
+    )
+    return result.rowcount
+
+
+async def unread_count(session: AsyncSession, member_id: int) -> int:
+    counter = await session.get(NotificationCounter, member_id)
+    return max(counter.unread_count, 0) if counter else 0
+
+
+class NotificationHub:
+    """Wakes the sessions waiting for a member's notifications in this worker.
+
+    With Redis every worker subscribes to the same channel, so a booking
+    made through one worker reaches sessions held by any other.
+    """
+
+    def __init__(self):
+        self._waiters: dict[int, set[asyncio.Event]] = defaultdict(set)
+        self._versions: dict[int, int] = defaultdict(int)
+        self._subscriber: asyncio.Task | None = None
+        self.watching: set[str] = set()
+
+    def version(self, member_id: int) -> int:
+        """Changes seen for the member so far, to pass to wait()."""
+        return self._versions[member_id]
+
+    async def wait(self, member_id: int, since: int, timeout: float) -> bool:
+        """Wait for a change after version `since`; False on timeout."""
+        self._ensure_subscriber()
+        if self._versions[member_id] != since:
+            return True
+        event = asyncio.Event()
+        self._waiters[member_id].add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters[member_id].discard(event)
+            if not self._waiters[member_id]:
+                del self._waiters[member_id]
+
+    async def notify(self, member_ids):
+        member_ids = set(member_ids)
+        if not member_ids:
+            return
+        if not await publish("notifications", ",".join(map(str, member_ids))):
+            self._wake(member_ids)
+
+    def _wake(self, member_ids):
+        for member_id in member_ids:
+            self._versions[member_id] += 1
+            for event in self._waiters.get(member_id, ()):
+                event.set()
+
+    def _ensure_subscriber(self):
+        # Without Redis, notify() wakes the local waiters directly.
+        if not REDIS_URL:
+            return
+        if self._subscriber is None or self._subscriber.done():
+            self._subscriber = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        try:
+            async for message in subscribe("notifications"):
+                self._wake(int(member_id) for member_id in message.split(","))
+        except Exception:
+            logging.exception("Notification subscription failed.")
+
+
+notification_hub = NotificationHub()
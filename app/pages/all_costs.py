@@ -3,6 +3,7 @@ from app.components.navbar import main_layout
 from app.states.auth_state import MyAuthState
 from app.states.all_costs_state import AllCostsState
 from app.models import CostWithMember
+from app.importer import COST_CATEGORIES
 
 
 def all_costs_page() -> rx.Component:
@@ -27,6 +28,7 @@ def all_costs_page() -> rx.Component:
                         ),
                         class_name="mt-8",
                     ),
+                    export_panel(),
                     rx.el.div(all_costs_table(), class_name="mt-2"),
                     on_mount=AllCostsState.get_all_costs,
                 ),
@@ -47,6 +49,47 @@ def all_costs_page() -> rx.Component:
     )
 
 
+def export_panel() -> rx.Component:
+    field_class = "px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm focus:outline-none focus:ring-violet-500 focus:border-violet-500"
+    return rx.el.div(
+        rx.el.label("Von", class_name="text-sm text-gray-600"),
+        rx.el.input(
+            type="date",
+            value=AllCostsState.export_start,
+            on_change=AllCostsState.set_export_start,
+            class_name=field_class,
+        ),
+        rx.el.label("Bis", class_name="text-sm text-gray-600"),
+        rx.el.input(
+            type="date",
+            value=AllCostsState.export_end,
+            on_change=AllCostsState.set_export_end,
+            class_name=field_class,
+        ),
+        rx.el.select(
+            rx.el.option("Alle Kategorien", value=""),
+            *[rx.el.option(category, value=category) for category in COST_CATEGORIES],
+            value=AllCostsState.export_category,
+            on_change=AllCostsState.set_export_category,
+            class_name=field_class,
+        ),
+        rx.cond(
+            AllCostsState.search_query.strip() != "",
+            rx.el.span(
+                "Nur Mitglieder mit „" + AllCostsState.search_query.strip() + "“",
+                class_name="text-sm text-gray-600",
+            ),
+        ),
+        rx.el.button(
+            rx.icon("download", size=16),
+            "CSV exportieren",
+            on_click=AllCostsState.export_costs,
+            class_name="flex items-center gap-2 bg-violet-600 text-white text-sm font-medium px-4 py-2 rounded-lg hover:bg-violet-700 shadow-sm",
+        ),
+        class_name="flex flex-wrap items-center gap-3 mb-6",
+    )
+
+
 def summary_cards() -> rx.Component:
     return rx.el.div(
         rx.el.div(
@@ -96,7 +139,17 @@ def summary_cards() -> rx.Component:
 
 def all_costs_table() -> rx.Component:
     return rx.el.div(
-        rx.foreach(AllCostsState.filtered_costs_by_week, weekly_cost_section),
+        rx.foreach(AllCostsState.cost_weeks, weekly_cost_section),
+        rx.cond(
+            AllCostsState.has_more_weeks,
+            rx.el.button(
+                "Ältere Wochen laden",
+                id="load-older-weeks",
+                on_click=AllCostsState.load_older_week,
+                class_name="w-full py-3 text-sm font-medium text-violet-600 hover:text-violet-800",
+            ),
+        ),
+        rx.script(src="/infinite_scroll.js"),
         class_name="space-y-8",
     )
 
@@ -170,4 +223,4 @@ def all_cost_row(cost: CostWithMember) -> rx.Component:
         rx.el.td(cost["date"], class_name="px-4 py-3 text-sm text-gray-800"),
         rx.el.td(cost["category"], class_name="px-4 py-3 text-sm text-gray-800"),
         class_name="hover:bg-gray-50",
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,86 @@
+import reflex as rx
+from app.components.navbar import main_layout
+from app.states.auth_state import MyAuthState
+from app.states.import_state import ImportState
+
+UPLOAD_ID = "cost_import"
+
+
+def cost_import_page() -> rx.Component:
+    return main_layout(
+        rx.el.div(
+            rx.cond(
+                MyAuthState.current_user["email"] == "acf@admin.com",
+                import_view(),
+                rx.el.div(
+                    rx.el.h1(
+                        "Nur der Admin kann Kosten importieren.",
+                        class_name="text-2xl font-bold text-gray-800",
+                    ),
+                    class_name="text-center p-8",
+                ),
+            )
+        )
+    )
+
+
+def import_view() -> rx.Component:
+    return rx.el.div(
+        rx.el.h1("Kosten importieren", class_name="text-3xl font-bold text-gray-900"),
+        rx.el.p(
+            "CSV mit den Spalten email, date, category, amount, description. "
+            "Getrennt durch Komma oder Semikolon, Datum als 2024-05-31 oder 31.05.2024.",
+            class_name="text-gray-600 mt-2 mb-6",
+        ),
+        rx.upload.root(
+            rx.el.div(
+                rx.icon("upload", size=28, class_name="text-violet-600"),
+                rx.el.p(
+                    rx.cond(
+                        rx.selected_files(UPLOAD_ID).length() > 0,
+                        rx.selected_files(UPLOAD_ID)[0],
+                        "CSV-Datei hierher ziehen oder klicken",
+                    ),
+                    class_name="text-sm text-gray-600",
+                ),
+                class_name="flex flex-col items-center gap-2 p-8",
+            ),
+            id=UPLOAD_ID,
+            accept={"text/csv": [".csv"]},
+            max_files=1,
+            class_name="border-2 border-dashed border-gray-300 rounded-xl bg-white cursor-pointer hover:border-violet-400",
+        ),
+        rx.el.button(
+            rx.cond(ImportState.importing, "Importiere...", "Importieren"),
+            on_click=ImportState.handle_upload(rx.upload_files(upload_id=UPLOAD_ID)),
+            disabled=ImportState.importing,
+            class_name="mt-4 bg-violet-600 text-white text-sm font-medium px-4 py-2 rounded-lg hover:bg-violet-700 disabled:opacity-50 shadow-sm",
+        ),
+        rx.cond(
+            ImportState.import_error != "",
+            rx.el.p(ImportState.import_error, class_name="mt-4 text-red-600"),
+        ),
+        import_result(),
+        class_name="max-w-2xl mx-auto",
+    )
+
+
+def import_result() -> rx.Component:
+    return rx.el.div(
+        rx.el.p(
+            ImportState.imported_count.to_string() + " importiert, ",
+            ImportState.rejected_count.to_string() + " abgelehnt.",
+            class_name="font-medium text-gray-800",
+        ),
+        rx.el.ul(
+            rx.foreach(
+                ImportState.rejects,
+                lambda reject: rx.el.li(
+                    "Zeile " + reject[0].to_string() + ": " + reject[1],
+                    class_name="text-sm text-gray-600",
+                ),
+            ),
+            class_name="mt-2 space-y-1",
+        ),
+        class_name="mt-6 p-4 bg-white rounded-xl border border-gray-200 shadow-sm",
+    )
\ No newline at end of file
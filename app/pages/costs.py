@@ -10,7 +10,7 @@ def costs_page() -> rx.Component:
             rx.cond(
                 MyAuthState.is_authenticated,
                 rx.cond(
-                    MyAuthState.current_user.email == "acf@admin.com",
+                    MyAuthState.current_user["email"] == "acf@admin.com",
                     rx.el.div(
                         rx.el.h1(
                             "Zugriff verweigert",
@@ -33,6 +33,12 @@ def costs_page() -> rx.Component:
                                 "Meine Kostenübersicht",
                                 class_name="text-3xl font-bold text-gray-900",
                             ),
+                            rx.el.button(
+                                rx.icon("download", size=16),
+                                "CSV exportieren",
+                                on_click=CostState.export_costs,
+                                class_name="flex items-center gap-2 text-sm font-medium text-violet-600 hover:text-violet-800",
+                            ),
                             class_name="flex justify-between items-center mb-8",
                         ),
                         summary_cards(),
@@ -202,6 +208,15 @@ def add_cost_form() -> rx.Component:
 
 def costs_table() -> rx.Component:
     return rx.el.div(
+        rx.el.div(
+            rx.el.button(
+                rx.icon("refresh-cw", size=16),
+                "Aktualisieren",
+                on_click=CostState.get_costs,
+                class_name="flex items-center gap-2 text-sm text-gray-500 hover:text-violet-600",
+            ),
+            class_name="flex justify-end mb-2",
+        ),
         rx.el.table(
             rx.el.thead(
                 rx.el.tr(
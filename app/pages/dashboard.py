@@ -0,0 +1,148 @@
+import reflex as rx
+from app.components.navbar import main_layout
+from app.states.auth_state import MyAuthState
+from app.states.dashboard_state import DASHBOARD_MONTHS, DashboardState
+
+# Series key, legend label and color of each category in the charts.
+SERIES = (
+    ("non_alcoholic", "Nicht-alkoholisch", "#a78bfa"),
+    ("alcoholic", "Alkoholisch", "#7c3aed"),
+    ("other", "Anderes", "#f59e0b"),
+)
+
+
+def dashboard_page() -> rx.Component:
+    return main_layout(
+        rx.el.div(
+            rx.cond(
+                MyAuthState.is_authenticated,
+                dashboard_view(),
+                rx.el.div(
+                    rx.el.h1(
+                        "Bitte melde dich an, um das Dashboard zu sehen.",
+                        class_name="text-2xl font-bold text-gray-800",
+                    ),
+                    rx.el.a(
+                        "Zum Login",
+                        href="/login",
+                        class_name="text-violet-600 hover:underline mt-2",
+                    ),
+                    class_name="text-center p-8",
+                ),
+            ),
+            on_mount=DashboardState.load_dashboard,
+        )
+    )
+
+
+def dashboard_view() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h1("Dashboard", class_name="text-3xl font-bold text-gray-900"),
+            rx.el.div(
+                rx.el.label(
+                    rx.el.input(
+                        type="checkbox",
+                        checked=DashboardState.own_costs_only,
+                        on_change=DashboardState.toggle_own_costs_only,
+                        class_name="accent-violet-600",
+                    ),
+                    "Nur meine Kosten",
+                    class_name="flex items-center gap-2 text-sm text-gray-600",
+                ),
+                rx.el.select(
+                    *[
+                        rx.el.option(f"Letzte {months} Monate", value=str(months))
+                        for months in DASHBOARD_MONTHS
+                    ],
+                    value=DashboardState.months.to_string(),
+                    on_change=DashboardState.set_months,
+                    class_name="px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm focus:outline-none focus:ring-violet-500 focus:border-violet-500",
+                ),
+                class_name="flex items-center gap-4",
+            ),
+            class_name="flex flex-wrap justify-between items-center gap-4 mb-8",
+        ),
+        summary_cards(),
+        rx.el.div(
+            monthly_chart(),
+            category_chart(),
+            class_name="grid md:grid-cols-3 gap-8 mt-8",
+        ),
+    )
+
+
+def summary_card(title: str, value: rx.Var) -> rx.Component:
+    return rx.el.div(
+        rx.el.h3(title, class_name="text-sm font-medium text-gray-500"),
+        rx.el.p(value, class_name="mt-1 text-3xl font-semibold text-gray-900"),
+        class_name="p-6 bg-white rounded-xl border border-gray-200 shadow-sm",
+    )
+
+
+def summary_cards() -> rx.Component:
+    return rx.el.div(
+        summary_card(
+            "Ausgaben im Zeitraum", "€" + DashboardState.total_spent.to_string()
+        ),
+        summary_card("Anzahl Kosten", DashboardState.total_count.to_string()),
+        summary_card(
+            "Durchschnitt pro Monat",
+            "€" + DashboardState.average_per_month.to_string(),
+        ),
+        class_name="grid md:grid-cols-3 gap-6",
+    )
+
+
+def monthly_chart() -> rx.Component:
+    return rx.el.div(
+        rx.el.h2(
+            "Ausgaben pro Monat", class_name="text-lg font-semibold text-gray-800 mb-4"
+        ),
+        rx.recharts.bar_chart(
+            rx.recharts.cartesian_grid(stroke_dasharray="3 3", vertical=False),
+            rx.recharts.x_axis(data_key="month"),
+            rx.recharts.y_axis(unit="€"),
+            rx.recharts.graphing_tooltip(),
+            rx.recharts.legend(),
+            *[
+                rx.recharts.bar(data_key=key, name=label, fill=color, stack_id="costs")
+                for key, label, color in SERIES
+            ],
+            data=DashboardState.monthly,
+            width="100%",
+            height=320,
+        ),
+        class_name="md:col-span-2 p-6 bg-white rounded-xl border border-gray-200 shadow-sm",
+    )
+
+
+def category_chart() -> rx.Component:
+    return rx.el.div(
+        rx.el.h2(
+            "Nach Kategorie", class_name="text-lg font-semibold text-gray-800 mb-4"
+        ),
+        rx.recharts.pie_chart(
+            rx.recharts.pie(
+                rx.foreach(
+                    DashboardState.category_shares,
+                    lambda share: rx.recharts.cell(
+                        fill=rx.match(
+                            share["series"],
+                            *[(key, color) for key, _, color in SERIES],
+                            "#9ca3af",
+                        )
+                    ),
+                ),
+                data=DashboardState.category_shares,
+                data_key="value",
+                name_key="name",
+                inner_radius="50%",
+                outer_radius="80%",
+            ),
+            rx.recharts.graphing_tooltip(),
+            width="100%",
+            height=320,
+        ),
+        class_name="p-6 bg-white rounded-xl border border-gray-200 shadow-sm",
+    )
\ No newline at end of file
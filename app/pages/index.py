@@ -9,7 +9,7 @@ def index() -> rx.Component:
             MyAuthState.is_authenticated,
             rx.el.div(
                 rx.el.h1(
-                    f"Willkommen, {MyAuthState.current_user.name}!",
+                    f"Willkommen, {MyAuthState.current_user['name']}!",
                     class_name="text-3xl font-bold text-gray-900",
                 ),
                 rx.el.p(
@@ -1,8 +1,9 @@
 import reflex as rx
 from app.components.navbar import main_layout
+from app.components.undo_control import undo_control
 from app.states.auth_state import MyAuthState
 from app.states.quick_entry_state import QuickEntryState
-from app.models import Member
+from app.models import MemberEntry
 
 
 def quick_entry_page() -> rx.Component:
@@ -34,6 +35,7 @@ def quick_entry_view() -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.h1("Quick Cost Entry", class_name="text-3xl font-bold text-gray-900"),
+            undo_control(),
             class_name="flex justify-between items-center mb-8",
         ),
         rx.el.input(
@@ -48,70 +50,88 @@ def quick_entry_view() -> rx.Component:
     )
 
 
-def member_entry_row(member: Member) -> rx.Component:
-    form_state = QuickEntryState.get_form_state[member.id]
-    is_custom_category = form_state["category"] == "Anderes"
+def member_entry_row(member: MemberEntry) -> rx.Component:
+    is_open = QuickEntryState.open_forms.contains(member["id"])
     return rx.el.div(
-        rx.el.h3(member.name, class_name="text-lg font-semibold text-gray-800 mb-2"),
         rx.el.div(
-            rx.el.select(
-                rx.el.option("Select Category", value="", disabled=True),
-                rx.foreach(
-                    QuickEntryState.categories.keys(),
-                    lambda c: rx.el.option(c, value=c),
+            rx.el.h3(member["name"], class_name="text-lg font-semibold text-gray-800"),
+            rx.el.div(
+                rx.el.button(
+                    rx.cond(is_open, rx.icon("x", size=20), rx.icon("pencil", size=20)),
+                    on_click=lambda: QuickEntryState.toggle_form(member["id"]),
+                    class_name="bg-gray-100 text-gray-700 p-2 rounded-md hover:bg-gray-200 transition-colors shadow-sm",
                 ),
-                value=form_state["category"],
-                on_change=lambda value: QuickEntryState.set_form_field(
-                    member.id, "category", value
+                rx.el.button(
+                    rx.icon("cup-soda", size=20),
+                    on_click=lambda: QuickEntryState.add_quick_drink_for_member(
+                        member["id"], "non-alcoholic", QuickEntryState.booking_key
+                    ),
+                    class_name="bg-blue-500 text-white p-2 rounded-md hover:bg-blue-600 transition-colors shadow-sm",
                 ),
-                class_name="flex-1 min-w-[150px] px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm focus:outline-none focus:ring-violet-500 focus:border-violet-500",
-            ),
-            rx.el.input(
-                placeholder="Amount",
-                on_change=lambda value: QuickEntryState.set_form_field(
-                    member.id, "amount", value
+                rx.el.button(
+                    rx.icon("beer", size=20),
+                    on_click=lambda: QuickEntryState.add_quick_drink_for_member(
+                        member["id"], "alcoholic", QuickEntryState.booking_key
+                    ),
+                    class_name="bg-yellow-500 text-white p-2 rounded-md hover:bg-yellow-600 transition-colors shadow-sm",
                 ),
-                is_disabled=~is_custom_category & (form_state["category"] != ""),
-                type="number",
-                class_name="flex-1 min-w-[100px] px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm placeholder-gray-400 focus:outline-none focus:ring-violet-500 focus:border-violet-500 disabled:bg-gray-100",
-                default_value=form_state["amount"],
+                class_name="flex items-center gap-2",
             ),
-            rx.el.input(
-                placeholder="Description (optional)",
-                on_change=lambda value: QuickEntryState.set_form_field(
-                    member.id, "description", value
-                ),
-                class_name="flex-1 min-w-[150px] px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm placeholder-gray-400 focus:outline-none focus:ring-violet-500 focus:border-violet-500",
-                default_value=form_state["description"],
+            class_name="flex justify-between items-center",
+        ),
+        rx.cond(is_open, member_entry_form(member["id"])),
+        class_name="p-4 bg-white rounded-xl border border-gray-200 shadow-sm",
+    )
+
+
+def member_entry_form(member_id: rx.Var[int]) -> rx.Component:
+    form_state = QuickEntryState.form_states[member_id]
+    is_custom_category = form_state["category"] == "Anderes"
+    return rx.el.div(
+        rx.el.select(
+            rx.el.option("Select Category", value="", disabled=True),
+            rx.foreach(
+                QuickEntryState.categories.keys(),
+                lambda c: rx.el.option(c, value=c),
             ),
-            rx.el.input(
-                type="date",
-                on_change=lambda value: QuickEntryState.set_form_field(
-                    member.id, "date", value
-                ),
-                class_name="flex-1 min-w-[130px] px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm focus:outline-none focus:ring-violet-500 focus:border-violet-500",
-                default_value=form_state["date"],
+            value=form_state["category"],
+            on_change=lambda value: QuickEntryState.set_form_field(
+                member_id, "category", value
             ),
-            rx.el.button(
-                "Add",
-                on_click=lambda: QuickEntryState.add_cost_for_member(member.id),
-                class_name="bg-violet-600 text-white px-4 py-2 rounded-md hover:bg-violet-700 transition-colors shadow-sm",
+            class_name="flex-1 min-w-[150px] px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm focus:outline-none focus:ring-violet-500 focus:border-violet-500",
+        ),
+        rx.el.input(
+            placeholder="Amount",
+            on_change=lambda value: QuickEntryState.set_form_field(
+                member_id, "amount", value
             ),
-            rx.el.button(
-                rx.icon("cup-soda", size=20),
-                on_click=lambda: QuickEntryState.add_quick_drink_for_member(
-                    member.id, "non-alcoholic"
-                ),
-                class_name="bg-blue-500 text-white p-2 rounded-md hover:bg-blue-600 transition-colors shadow-sm",
+            is_disabled=~is_custom_category & (form_state["category"] != ""),
+            type="number",
+            class_name="flex-1 min-w-[100px] px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm placeholder-gray-400 focus:outline-none focus:ring-violet-500 focus:border-violet-500 disabled:bg-gray-100",
+            default_value=form_state["amount"],
+        ),
+        rx.el.input(
+            placeholder="Description (optional)",
+            on_change=lambda value: QuickEntryState.set_form_field(
+                member_id, "description", value
             ),
-            rx.el.button(
-                rx.icon("beer", size=20),
-                on_click=lambda: QuickEntryState.add_quick_drink_for_member(
-                    member.id, "alcoholic"
-                ),
-                class_name="bg-yellow-500 text-white p-2 rounded-md hover:bg-yellow-600 transition-colors shadow-sm",
+            class_name="flex-1 min-w-[150px] px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm placeholder-gray-400 focus:outline-none focus:ring-violet-500 focus:border-violet-500",
+            default_value=form_state["description"],
+        ),
+        rx.el.input(
+            type="date",
+            on_change=lambda value: QuickEntryState.set_form_field(
+                member_id, "date", value
             ),
-            class_name="flex flex-wrap items-center gap-2",
+            class_name="flex-1 min-w-[130px] px-3 py-2 bg-white border border-gray-300 rounded-md text-sm text-gray-800 shadow-sm focus:outline-none focus:ring-violet-500 focus:border-violet-500",
+            default_value=form_state["date"],
         ),
-        class_name="p-4 bg-white rounded-xl border border-gray-200 shadow-sm",
+        rx.el.button(
+            "Add",
+            on_click=lambda: QuickEntryState.add_cost_for_member(
+                member_id, QuickEntryState.booking_key
+            ),
+            class_name="bg-violet-600 text-white px-4 py-2 rounded-md hover:bg-violet-700 transition-colors shadow-sm",
+        ),
+        class_name="flex flex-wrap items-center gap-2 mt-3",
     )
\ No newline at end of file
@@ -1,9 +1,12 @@
 import reflex as rx
 from app.components.navbar import main_layout
+from app.components.undo_control import undo_control
 from app.states.auth_state import MyAuthState
 from app.states.quick_entry_state import QuickEntryState
-from app.models import Member
+from app.api import BULK_BOOKING_PATH
+from app.models import MemberEntry
 from app.pages.quick_entry import login_prompt
+import json
 
 
 def tile_entry_page() -> rx.Component:
@@ -22,6 +25,30 @@ def tile_entry_view() -> rx.Component:
                 "Tile Cost Entry",
                 class_name="text-xl md:text-3xl font-bold text-gray-900",
             ),
+            rx.el.div(
+                rx.cond(
+                    QuickEntryState.offline_mode == "1",
+                    rx.el.span(
+                        id="booking-queue-status", class_name="text-sm text-gray-500"
+                    ),
+                ),
+                rx.el.button(
+                    rx.icon("wifi-off", size=16),
+                    rx.cond(
+                        QuickEntryState.offline_mode == "1",
+                        "Offline-Modus an",
+                        "Offline-Modus",
+                    ),
+                    on_click=QuickEntryState.toggle_offline_mode,
+                    class_name=rx.cond(
+                        QuickEntryState.offline_mode == "1",
+                        "flex items-center gap-2 bg-violet-600 text-white text-sm font-medium px-3 py-2 rounded-md shadow-sm",
+                        "flex items-center gap-2 bg-gray-100 text-gray-700 text-sm font-medium px-3 py-2 rounded-md hover:bg-gray-200 shadow-sm",
+                    ),
+                ),
+                rx.cond(QuickEntryState.offline_mode != "1", undo_control()),
+                class_name="flex items-center gap-3",
+            ),
             class_name="flex justify-between items-center mb-2 md:mb-4",
         ),
         rx.el.input(
@@ -30,35 +57,81 @@ def tile_entry_view() -> rx.Component:
             class_name="w-full max-w-sm px-3 py-2 md:px-4 md:py-3 mb-2 md:mb-4 border border-gray-300 rounded-lg md:rounded-xl shadow-sm focus:outline-none focus:ring-2 focus:ring-violet-500 text-sm md:text-base",
         ),
         rx.el.div(
-            rx.foreach(QuickEntryState.filtered_members, member_tile),
+            rx.cond(
+                QuickEntryState.offline_mode == "1",
+                rx.foreach(QuickEntryState.filtered_members, offline_member_tile),
+                rx.foreach(QuickEntryState.filtered_members, member_tile),
+            ),
             class_name="grid grid-cols-3 md:grid-cols-4 lg:grid-cols-5 xl:grid-cols-6 gap-3 md:gap-4",
         ),
         selection_dialog(),
         confirmation_dialog(),
+        rx.script(
+            f"window.kassenBulkBookingUrl = "
+            f"{json.dumps(rx.config.get_config().api_url.rstrip('/') + BULK_BOOKING_PATH)};"
+        ),
+        rx.script(src="/booking_queue.js"),
     )
 
 
-def member_tile(member: Member) -> rx.Component:
+def member_tile(member: MemberEntry) -> rx.Component:
     return rx.el.button(
         rx.el.div(
             rx.image(
-                src=f"https://api.dicebear.com/9.x/initials/svg?seed={member.name}",
+                src=f"https://api.dicebear.com/9.x/initials/svg?seed={member['name']}",
+                alt=member["initials"],
                 class_name="w-12 h-12 md:w-16 md:h-16 rounded-full mb-1 md:mb-2 bg-violet-100 shadow-sm",
             ),
             rx.el.h3(
-                member.name,
+                member["name"],
                 class_name="font-semibold text-gray-800 text-center truncate w-full px-1 md:px-2 text-xs md:text-base",
             ),
             class_name="flex flex-col items-center justify-center h-full w-full",
         ),
-        on_click=lambda: QuickEntryState.open_selection(member.id),
+        on_click=lambda: QuickEntryState.open_selection(member["id"]),
         class_name="bg-white rounded-xl md:rounded-2xl border border-gray-200 shadow-sm hover:shadow-lg transition-all transform hover:scale-[1.02] active:scale-95 p-2 md:p-4 h-28 md:h-48 w-full flex flex-col items-center justify-center",
     )
 
 
+def offline_member_tile(member: MemberEntry) -> rx.Component:
+    """A tile booking drinks through the local queue, without the dialog."""
+    return rx.el.div(
+        rx.image(
+            src=f"https://api.dicebear.com/9.x/initials/svg?seed={member['name']}",
+            alt=member["initials"],
+            class_name="w-10 h-10 md:w-14 md:h-14 rounded-full mb-1 bg-violet-100 shadow-sm",
+        ),
+        rx.el.h3(
+            member["name"],
+            class_name="font-semibold text-gray-800 text-center truncate w-full px-1 text-xs md:text-base",
+        ),
+        rx.el.div(
+            rx.el.button(
+                rx.icon("cup-soda", size=20),
+                custom_attrs={
+                    "data-booking-member": member["id"],
+                    "data-booking-drink": "non-alcoholic",
+                },
+                class_name="flex-1 flex justify-center bg-blue-500 text-white p-2 rounded-lg hover:bg-blue-600 active:scale-95",
+            ),
+            rx.el.button(
+                rx.icon("beer", size=20),
+                custom_attrs={
+                    "data-booking-member": member["id"],
+                    "data-booking-drink": "alcoholic",
+                },
+                class_name="flex-1 flex justify-center bg-amber-500 text-white p-2 rounded-lg hover:bg-amber-600 active:scale-95",
+            ),
+            class_name="flex gap-2 w-full mt-2",
+        ),
+        id=f"tile-{member['id']}",
+        class_name="bg-white rounded-xl md:rounded-2xl border border-gray-200 shadow-sm p-2 md:p-4 h-36 md:h-52 w-full flex flex-col items-center justify-center transition-all",
+    )
+
+
 def selection_dialog() -> rx.Component:
     member_id = QuickEntryState.selected_member_id
-    form_state = QuickEntryState.get_form_state[member_id]
+    form_state = QuickEntryState.form_states[member_id]
     is_custom_category = form_state["category"] == "Anderes"
     return rx.radix.primitives.dialog.root(
         rx.radix.primitives.dialog.portal(
@@ -68,7 +141,7 @@ def selection_dialog() -> rx.Component:
             rx.radix.primitives.dialog.content(
                 rx.el.div(
                     rx.radix.primitives.dialog.title(
-                        QuickEntryState.selected_member.name,
+                        QuickEntryState.selected_member["name"],
                         class_name="text-3xl font-bold text-gray-900 text-center mb-2",
                     ),
                     rx.radix.primitives.dialog.description(
@@ -91,7 +164,9 @@ def selection_dialog() -> rx.Component:
                                     class_name="flex flex-col items-center",
                                 ),
                                 on_click=lambda: QuickEntryState.add_quick_drink_for_member(
-                                    member_id, "non-alcoholic"
+                                    member_id,
+                                    "non-alcoholic",
+                                    QuickEntryState.booking_key,
                                 ),
                                 class_name="bg-blue-500 hover:bg-blue-600 text-white rounded-2xl p-8 shadow-lg transition-transform active:scale-95 flex justify-center items-center h-48",
                             ),
@@ -108,7 +183,7 @@ def selection_dialog() -> rx.Component:
                                     class_name="flex flex-col items-center",
                                 ),
                                 on_click=lambda: QuickEntryState.add_quick_drink_for_member(
-                                    member_id, "alcoholic"
+                                    member_id, "alcoholic", QuickEntryState.booking_key
                                 ),
                                 class_name="bg-amber-500 hover:bg-amber-600 text-white rounded-2xl p-8 shadow-lg transition-transform active:scale-95 flex justify-center items-center h-48",
                             ),
@@ -190,7 +265,7 @@ def selection_dialog() -> rx.Component:
                                 rx.el.button(
                                     "Hinzufügen",
                                     on_click=lambda: QuickEntryState.add_cost_for_member(
-                                        member_id
+                                        member_id, QuickEntryState.booking_key
                                     ),
                                     class_name="flex-1 bg-violet-600 text-white p-4 rounded-xl text-lg font-semibold hover:bg-violet-700 shadow-md",
                                 ),
@@ -218,7 +293,7 @@ def selection_dialog() -> rx.Component:
             ),
         ),
         open=QuickEntryState.is_selection_open,
-        on_open_change=QuickEntryState.set_is_selection_open,
+        on_open_change=QuickEntryState.set_selection_open,
     )
 
 
@@ -256,7 +331,7 @@ def confirmation_dialog() -> rx.Component:
                     rx.el.div(
                         rx.el.button(
                             "Rückgängig",
-                            on_click=QuickEntryState.undo_last_booking,
+                            on_click=QuickEntryState.undo_last_bookings(1),
                             class_name="flex-none bg-red-100 text-red-600 text-base font-medium px-6 py-3 rounded-2xl hover:bg-red-200 hover:text-red-700 shadow-sm transition-colors active:scale-95",
                         ),
                         rx.radix.primitives.dialog.close(
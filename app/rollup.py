@@ -0,0 +1,126 @@
+"""Weekly and monthly cost rollups maintained alongside every cost write.
+
+Each cost insert or delete adds a +1/-1 delta to its (week_start, member_id,
+category) and (month_start, member_id, category) rows in the same
+transaction, so week headers, subtotals, summary cards and the dashboard
+can be read without touching the cost table.
+"""
+
+from collections import defaultdict
+from typing import Iterable, Iterator
+from sqlalchemy import delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import (
+    Cost,
+    MonthlyCostRollup,
+    WeeklyCostRollup,
+    month_start_of,
+    week_start_of,
+)
+import datetime as dt
+
+# Each rollup table, its period column and the period a cost date falls in.
+ROLLUPS = (
+    (WeeklyCostRollup, "week_start", week_start_of),
+    (MonthlyCostRollup, "month_start", month_start_of),
+)
+
+
+def rollup_upsert(dialect_name: str, rollup: type = WeeklyCostRollup):
+    """Upsert adding cost_count and amount_cents to a rollup row.
+
+    Without values, so a batch of deltas can be passed as executemany params.
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    upsert = insert(rollup)
+    return upsert.on_conflict_do_update(
+        index_elements=[column.name for column in rollup.__table__.primary_key],
+        set_={
+            "cost_count": rollup.cost_count + upsert.excluded.cost_count,
+            "amount_cents": rollup.amount_cents + upsert.excluded.amount_cents,
+        },
+    )
+
+
+def rollup_deltas(
+    deltas: Iterable[tuple[dt.date, int, str, int, int]],
+) -> Iterator[tuple[type, list[dict]]]:
+    """Fold (date, member_id, category, count, amount_cents) deltas into rows.
+
+    Yields each rollup table with one parameter dict per row it touches.
+    """
+    deltas = list(deltas)
+    for rollup, period, period_start in ROLLUPS:
+        totals: dict[tuple, list[int]] = defaultdict(lambda: [0, 0])
+        for cost_date, member_id, category, count, amount_cents in deltas:
+            entry = totals[(period_start(cost_date), member_id, category)]
+            entry[0] += count
+            entry[1] += amount_cents
+        yield rollup, [
+            {
+                period: start,
+                "member_id": member_id,
+                "category": category,
+                "cost_count": count,
+                "amount_cents": amount_cents,
+            }
+            for (start, member_id, category), (count, amount_cents) in totals.items()
+        ]
+
+
+async def record_cost(session: AsyncSession, cost: Cost, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) a cost from the rollups.
+
+    Call before committing the session that inserts or deletes the cost.
+    """
+    await record_costs(session, [cost], sign)
+
+
+async def record_costs(session: AsyncSession, costs: list[Cost], sign: int = 1):
+    """Like record_cost, with one upsert per rollup row touched by the batch."""
+    if not costs:
+        return
+    dialect_name = session.bind.dialect.name
+    for rollup, rows in rollup_deltas(
+        (cost.date, cost.member_id, cost.category, sign, sign * cost.amount_cents)
+        for cost in costs
+    ):
+        await session.exec(rollup_upsert(dialect_name, rollup), params=rows)
+        if sign > 0:
+            continue
+        # Rows emptied by deletes are removed, as if never written.
+        for row in rows:
+            await session.exec(
+                delete(rollup).where(
+                    *(
+                        getattr(rollup, column.name) == row[column.name]
+                        for column in rollup.__table__.primary_key
+                    ),
+                    rollup.cost_count <= 0,
+                )
+            )
+
+
+def rebuild_rollup(session: Session) -> int:
+    """Recompute the rollups from the cost table.
+
+    Returns the number of weekly rollup rows written. The caller commits.
+    """
+    per_day = session.exec(
+        select(
+            Cost.date,
+            Cost.member_id,
+            Cost.category,
+            func.count(Cost.id),
+            func.sum(Cost.amount_cents),
+        ).group_by(Cost.date, Cost.member_id, Cost.category)
+    )
+    written = {}
+    for rollup, rows in rollup_deltas(per_day):
+        session.exec(delete(rollup))
+        if rows:
+            session.exec(rollup.__table__.insert(), params=rows)
+        written[rollup] = len(rows)
+    return written[WeeklyCostRollup]
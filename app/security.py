@@ -0,0 +1,206 @@
+"""Password hashing off the event loop, and signed session tokens.
+
+bcrypt burns a couple of hundred milliseconds of CPU per call, so hashing
+and verification run in a bounded thread pool (bcrypt releases the GIL)
+instead of blocking every connected tablet. BCRYPT_ROUNDS sets the work
+factor for new hashes; existing hashes keep the factor they were made with.
+
+After a successful login the browser keeps an HMAC-signed, expiring session
+token in local storage. It survives backend restarts and state eviction, so
+tablets stay logged in without another bcrypt round, and checking it is a
+cache lookup.
+
+Export downloads get their own short-lived tokens, bound to the filters
+they were issued for, so a download link in a log or the browser history
+is useless after a few minutes and never grants a session.
+"""
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from app.models import CurrentUser
+from app.shared_cache import shared_secret
+import asyncio
+import bcrypt
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+BCRYPT_SLOW_WAIT_MS = float(os.getenv("BCRYPT_SLOW_WAIT_MS", "500"))
+
+SESSION_TTL_HOURS = float(os.getenv("SESSION_TTL_HOURS", "12"))
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "300"))
+EXPORT_TOKEN_MINUTES = float(os.getenv("EXPORT_TOKEN_MINUTES", "5"))
+# Without SESSION_SECRET the workers share a random key kept in Redis, or
+# in a file in SECRETS_DIR without Redis; sessions end when that key is lost.
+SESSION_SECRET = os.getenv("SESSION_SECRET") or shared_secret("session")
+
+
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(
+        password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    ).decode("utf-8")
+
+
+def verify_password(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+class HashingPoolStats:
+    """Queue depth and wait times of the hashing pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.count = 0
+        self.total_wait_ms = 0.0
+
+    def submitted(self):
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+    def started(self, waited_ms: float):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.count += 1
+            self.total_wait_ms += waited_ms
+            queued = self.queued
+        if waited_ms >= BCRYPT_SLOW_WAIT_MS:
+            logging.warning(
+                f"Password hash waited {waited_ms:.0f} ms for a worker "
+                f"({queued} still queued, {BCRYPT_WORKERS} workers)"
+            )
+
+    def finished(self):
+        with self._lock:
+            self.running -= 1
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "count": self.count,
+                "avg_wait_ms": self.total_wait_ms / self.count if self.count else 0.0,
+            }
+
+
+hashing_pool_stats = HashingPoolStats()
+_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+
+
+async def _run_in_pool(func, *args):
+    submitted_at = time.perf_counter()
+    hashing_pool_stats.submitted()
+
+    def job():
+        hashing_pool_stats.started((time.perf_counter() - submitted_at) * 1000)
+        try:
+            return func(*args)
+        finally:
+            hashing_pool_stats.finished()
+
+    return await asyncio.get_running_loop().run_in_executor(_executor, job)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await _run_in_pool(verify_password, password, hashed_password)
+
+
+_verified_sessions: TTLCache = TTLCache(maxsize=4096, ttl=SESSION_CACHE_TTL)
+
+
+def _b64encode(data: bytes) -> str:
+    return urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str, scope: str = "") -> str:
+    # Scoped tokens sign a prefixed message, so they never pass as sessions.
+    message = f"{scope}:{payload}" if scope else payload
+    return _b64encode(
+        hmac.new(SESSION_SECRET.encode(), message.encode(), hashlib.sha256).digest()
+    )
+
+
+def issue_session_token(user: CurrentUser) -> str:
+    """Sign the user's identity with an expiry of SESSION_TTL_HOURS."""
+    payload = _b64encode(
+        json.dumps(
+            {**user, "exp": int(time.time() + SESSION_TTL_HOURS * 3600)},
+            separators=(",", ":"),
+        ).encode()
+    )
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_session_token(token: str) -> CurrentUser | None:
+    """The user a token was issued to, or None if it is forged or expired."""
+    if not token:
+        return None
+    cached = _verified_sessions.get(token)
+    if cached is None:
+        payload, _, signature = token.partition(".")
+        # Bytes: compare_digest rejects str with non-ASCII characters.
+        if not hmac.compare_digest(signature.encode(), _sign(payload).encode()):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        cached = (
+            {"id": claims["id"], "name": claims["name"], "email": claims["email"]},
+            claims["exp"],
+        )
+        _verified_sessions[token] = cached
+    user, expires = cached
+    if expires <= time.time():
+        return None
+    return user
+
+
+def issue_export_token(user_id: int, filters: dict) -> str:
+    """Allow downloading the export with these filters for EXPORT_TOKEN_MINUTES."""
+    payload = _b64encode(
+        json.dumps(
+            {
+                "sub": user_id,
+                "filters": filters,
+                "exp": int(time.time() + EXPORT_TOKEN_MINUTES * 60),
+            },
+            separators=(",", ":"),
+        ).encode()
+    )
+    return f"{payload}.{_sign(payload, 'export')}"
+
+
+def verify_export_token(token: str) -> dict | None:
+    """The filters an export token was issued for, or None if forged or expired."""
+    payload, _, signature = token.partition(".")
+    if not hmac.compare_digest(signature.encode(), _sign(payload, "export").encode()):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+    if claims["exp"] <= time.time():
+        return None
+    return claims["filters"]
@@ -0,0 +1,298 @@
+"""Demo and benchmark data for the Kassen-App database.
+
+Nothing here runs at app startup; use ``python -m app.cli seed`` for the
+demo members and ``python -m app.cli seed-synthetic`` for large datasets.
+Both take a random seed, so the same arguments produce the same data.
+"""
+
+from datetime import date, timedelta
+from sqlalchemy import insert
+from sqlmodel import Session, select
+from app.models import Member, Cost, to_cents
+from app.rollup import rebuild_rollup
+from app.security import hash_password
+import random
+
+SEED_BATCH_SIZE = 10_000
+
+ADMIN = {"name": "ACF Admin", "email": "acf@admin.com", "password": "admin123"}
+EXAMPLE_MEMBERS = [
+    {"name": "Alex Example", "email": "alex@example.com", "password": "password123"},
+    {"name": "Jamie Sample", "email": "jamie@example.com", "password": "secret456"},
+    {"name": "Taylor Demo", "email": "taylor@example.com", "password": "demo789"},
+]
+EXAMPLE_COSTS = [
+    {
+        "member_email": "alex@example.com",
+        "description": "Club lemonade",
+        "amount": 1.5,
+        "days_ago": 1,
+        "category": "Getränk (nicht-alkoholisch) - €1.50",
+    },
+    {
+        "member_email": "alex@example.com",
+        "description": "Team snacks",
+        "amount": 8.75,
+        "days_ago": 3,
+        "category": "Snacks",
+    },
+    {
+        "member_email": "jamie@example.com",
+        "description": "Sparkling water",
+        "amount": 2.5,
+        "days_ago": 2,
+        "category": "Getränk (alkoholisch) - €2.50",
+    },
+    {
+        "member_email": "taylor@example.com",
+        "description": "Reusable cups",
+        "amount": 12.0,
+        "days_ago": 6,
+        "category": "Supplies",
+    },
+]
+TEST_PASSWORD = "test123"
+GERMAN_MEMBERS = [
+    "Moritz Fuchs",
+    "Nina Schwarz",
+    "Thomas Schröder",
+    "Michael Schmitt",
+    "Sabrina Koch",
+    "Lukas Becker",
+    "Julia Richter",
+    "Kevin Klein",
+    "Laura Wolf",
+    "Daniel Neumann",
+    "Vanessa Schreiber",
+    "Fabian Zimmermann",
+    "Melanie Krüger",
+    "Sebastian Hoffmann",
+    "Tina Hartmann",
+    "Philipp Lange",
+    "Anna Werner",
+    "Marco Schmid",
+    "Lisa Krause",
+    "Patrick Meier",
+    "Sarah Lehmann",
+    "Tim Köhler",
+    "Michelle Huber",
+    "Florian Mayer",
+    "Jennifer Herrmann",
+    "Dominik König",
+    "Stephanie Schulze",
+    "Oliver Braun",
+    "Katharina Walter",
+    "Tobias Kraus",
+    "Christina Friedrich",
+    "Matthias Fischer",
+    "Sandra Schmitt",
+    "Andreas Weiß",
+    "Nadine Wagner",
+    "Mario Bauer",
+    "Tanja Roth",
+    "Christian Zimmermann",
+    "Franziska Schneider",
+    "Simon Peters",
+    "Daniela Müller",
+    "Felix Hoffmann",
+    "Jasmin Klein",
+    "Maximilian Berger",
+    "Melissa Weber",
+    "Nicolas Schwarz",
+    "Veronica Schäfer",
+    "David Becker",
+    "Simone Graf",
+    "Robert Vogel",
+]
+OTHER_DESCRIPTIONS = [
+    "Snacks",
+    "Supplies",
+    "Team Event",
+    "Equipment",
+    "Taxi",
+    "Büromaterial",
+    "Pizza",
+    "Dekoration",
+    "Vereinsfeier",
+    "Trikots",
+]
+
+
+def email_local_part(name: str) -> str:
+    return (
+        name.lower()
+        .replace(" ", ".")
+        .replace("ä", "ae")
+        .replace("ö", "oe")
+        .replace("ü", "ue")
+        .replace("ß", "ss")
+    )
+
+
+def random_cost(rng: random.Random, member_id: int, cost_date: date) -> dict:
+    """One cost row as the quick-entry and costs pages would book it."""
+    cat_type = rng.choice(["non-alc", "alc", "other"])
+    if cat_type == "non-alc":
+        category = "Getränke (nicht-alkoholisch) - €1.50"
+        amount = 1.5
+        description = "Nicht-alkoholisches Getränk"
+    elif cat_type == "alc":
+        category = "Getränke (alkoholisch) - €2.50"
+        amount = 2.5
+        description = "Alkoholisches Getränk"
+    else:
+        category = "Anderes"
+        amount = round(rng.uniform(5.0, 30.0), 2)
+        description = rng.choice(OTHER_DESCRIPTIONS)
+    return {
+        "description": description,
+        "amount_cents": to_cents(amount),
+        "date": cost_date,
+        "category": category,
+        "member_id": member_id,
+    }
+
+
+def insert_members(session: Session, rows: list[dict]) -> dict[str, int]:
+    """Bulk insert members and return their ids by email."""
+    for start in range(0, len(rows), SEED_BATCH_SIZE):
+        session.exec(insert(Member), params=rows[start : start + SEED_BATCH_SIZE])
+    emails = [row["email"] for row in rows]
+    ids: dict[str, int] = {}
+    for start in range(0, len(emails), SEED_BATCH_SIZE):
+        ids.update(
+            (email, member_id)
+            for email, member_id in session.exec(
+                select(Member.email, Member.id).where(
+                    Member.email.in_(emails[start : start + SEED_BATCH_SIZE])
+                )
+            )
+        )
+    return ids
+
+
+def insert_costs(session: Session, rows) -> int:
+    """Bulk insert cost rows from any iterable, SEED_BATCH_SIZE at a time."""
+    inserted = 0
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == SEED_BATCH_SIZE:
+            session.exec(insert(Cost), params=batch)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        session.exec(insert(Cost), params=batch)
+        inserted += len(batch)
+    return inserted
+
+
+def seed_test_data(session: Session, seed: int = 0) -> tuple[int, int]:
+    """Add the admin, example and test members with a few costs each.
+
+    Members whose email already exists are skipped, so running it twice is
+    harmless. Returns (members added, costs added); the caller commits.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    existing_emails = set(session.exec(select(Member.email)).all())
+    new_members = []
+    for data in [ADMIN, *EXAMPLE_MEMBERS]:
+        if data["email"] not in existing_emails:
+            new_members.append(
+                {
+                    "name": data["name"],
+                    "email": data["email"],
+                    "password": hash_password(data["password"]),
+                }
+            )
+    test_members = []
+    for i, name in enumerate(GERMAN_MEMBERS, 1):
+        email = f"{email_local_part(name)}{i}@testverein.de"
+        if email not in existing_emails:
+            test_members.append({"name": name, "email": email})
+    if test_members:
+        common_password_hash = hash_password(TEST_PASSWORD)
+        for member in test_members:
+            member["password"] = common_password_hash
+    new_members.extend(test_members)
+    if not new_members:
+        return 0, 0
+    member_ids = insert_members(session, new_members)
+    costs = [
+        {
+            "description": cost["description"],
+            "amount_cents": to_cents(cost["amount"]),
+            "date": today - timedelta(days=cost["days_ago"]),
+            "category": cost["category"],
+            "member_id": member_ids[cost["member_email"]],
+        }
+        for cost in EXAMPLE_COSTS
+        if cost["member_email"] in member_ids
+    ]
+    for member in test_members:
+        for _ in range(rng.randint(3, 8)):
+            costs.append(
+                random_cost(
+                    rng,
+                    member_ids[member["email"]],
+                    today - timedelta(days=rng.randint(0, 30)),
+                )
+            )
+    cost_count = insert_costs(session, costs)
+    rebuild_rollup(session)
+    return len(new_members), cost_count
+
+
+def seed_synthetic_data(
+    session: Session,
+    members: int,
+    costs: int,
+    days: int = 365,
+    seed: int = 0,
+) -> tuple[int, int]:
+    """Generate a benchmark dataset of ``members`` members and ``costs`` costs.
+
+    Synthetic members get @synthetic.test emails numbered after the ones
+    already present and share the password "test123". Costs are spread over
+    the last ``days`` days. Returns (members added, costs added); the caller
+    commits.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    offset = len(
+        session.exec(
+            select(Member.id).where(Member.email.like("%@synthetic.test"))
+        ).all()
+    )
+    first_names = sorted({name.split()[0] for name in GERMAN_MEMBERS})
+    last_names = sorted({name.split()[-1] for name in GERMAN_MEMBERS})
+    password_hash = hash_password(TEST_PASSWORD)
+    rows = []
+    for i in range(offset + 1, offset + members + 1):
+        name = f"{rng.choice(first_names)} {rng.choice(last_names)}"
+        rows.append(
+            {
+                "name": name,
+                "email": f"{email_local_part(name)}{i}@synthetic.test",
+                "password": password_hash,
+            }
+        )
+    member_ids = sorted(insert_members(session, rows).values())
+    if not member_ids:
+        member_ids = list(session.exec(select(Member.id).order_by(Member.id)).all())
+    cost_count = 0
+    if member_ids:
+        cost_count = insert_costs(
+            session,
+            (
+                random_cost(
+                    rng,
+                    rng.choice(member_ids),
+                    today - timedelta(days=rng.randrange(days)),
+                )
+                for _ in range(costs)
+            ),
+        )
+    rebuild_rollup(session)
+    return len(rows), cost_count
@@ -0,0 +1,91 @@
+"""Cache invalidation and messages shared between backend workers.
+
+Each worker keeps its own member directory and summary cache. With
+REDIS_URL set, writers bump a generation counter in Redis and every worker
+compares it with the generation its cached copy was built from, so a
+registration or booking handled by one worker is seen by all of them.
+Notification pushes travel over Redis pub/sub the same way. Without Redis
+there is a single worker and the counters live in memory.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+import os
+import secrets
+
+REDIS_URL = os.getenv("REDIS_URL", "")
+KEY_PREFIX = "kassenapp"
+# Without Redis, shared secrets are kept in files here so they survive
+# restarts. Defaults to the working directory, next to association.db.
+SECRETS_DIR = Path(os.getenv("SECRETS_DIR", "."))
+
+_local_generations: dict[str, int] = defaultdict(int)
+_redis = None
+if REDIS_URL:
+    import redis.asyncio
+
+    _redis = redis.asyncio.from_url(REDIS_URL)
+
+
+async def generation(name: str) -> int:
+    """The current generation of a cached dataset."""
+    if _redis is None:
+        return _local_generations[name]
+    return int(await _redis.get(f"{KEY_PREFIX}:generation:{name}") or 0)
+
+
+async def bump_generation(name: str) -> int:
+    """Mark every worker's copy of a dataset as stale; returns the new value."""
+    if _redis is None:
+        _local_generations[name] += 1
+        return _local_generations[name]
+    return await _redis.incr(f"{KEY_PREFIX}:generation:{name}")
+
+
+async def publish(channel: str, message: str) -> bool:
+    """Send a message to every worker; False when there is no Redis."""
+    if _redis is None:
+        return False
+    await _redis.publish(f"{KEY_PREFIX}:{channel}", message)
+    return True
+
+
+async def subscribe(channel: str):
+    """Yield the messages published on a channel, from any worker."""
+    async with _redis.pubsub() as pubsub:
+        await pubsub.subscribe(f"{KEY_PREFIX}:{channel}")
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                yield message["data"].decode()
+
+
+def _file_secret(name: str) -> str:
+    path = SECRETS_DIR / f".{KEY_PREFIX}-{name}-secret"
+    if not path.exists():
+        # Written aside and linked into place, so a concurrent start or a
+        # crash never leaves a partial secret behind.
+        temporary = path.with_name(f"{path.name}.{os.getpid()}")
+        temporary.write_text(secrets.token_hex(32))
+        temporary.chmod(0o600)
+        try:
+            os.link(temporary, path)
+        except FileExistsError:
+            pass
+        finally:
+            temporary.unlink()
+    return path.read_text().strip()
+
+
+def shared_secret(name: str) -> str:
+    """A random secret that all workers agree on, created by the first one.
+
+    Without Redis it is kept in a file in SECRETS_DIR.
+    """
+    if not REDIS_URL:
+        return _file_secret(name)
+    import redis
+
+    client = redis.from_url(REDIS_URL)
+    key = f"{KEY_PREFIX}:secret:{name}"
+    client.set(key, secrets.token_hex(32), nx=True)
+    return client.get(key).decode()
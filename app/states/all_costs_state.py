@@ -1,32 +1,85 @@
 import reflex as rx
-import logging
-from sqlmodel import select
+from sqlalchemy import func
+from sqlmodel import and_, or_, select
 from .base_state import BaseState
-from app.models import Cost, Member, CostWithMember
-from .auth_state import MyAuthState
-from app.database import db_session
+from app.models import (
+    Cost,
+    Member,
+    CostSummary,
+    CostWithMember,
+    WeeklyCostRollup,
+    from_cents,
+    member_name_contains,
+    week_start_of,
+)
+from app.aggregates import EMPTY_SUMMARY, cost_summary
+from app.database import async_db_session
+from app.export import export_url
 from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+import json
 
 
 class AllCostsState(BaseState):
-    all_costs: list[CostWithMember] = []
+    cost_weeks: list[
+        tuple[str, list[tuple[str, list[CostWithMember], float]], float]
+    ] = []
     search_query: str = ""
+    cursor_date: str = ""
+    cursor_id: int = 0
+    has_more_weeks: bool = True
+    summary: CostSummary = EMPTY_SUMMARY
+    export_start: str = ""
+    export_end: str = ""
+    export_category: str = ""
 
     @rx.event
-    def set_search_query(self, query: str):
-        """Set the search query for filtering members."""
+    async def set_search_query(self, query: str):
+        """Set the search query and reload the listing from the newest week."""
         self.search_query = query
+        await self._reset_and_load()
+
+    @rx.event
+    def set_export_start(self, value: str):
+        self.export_start = value
+
+    @rx.event
+    def set_export_end(self, value: str):
+        self.export_end = value
+
+    @rx.event
+    def set_export_category(self, value: str):
+        self.export_category = value
+
+    @rx.event
+    def export_costs(self):
+        """Start the CSV download with a freshly issued export link."""
+        member_id = self._member_id()
+        if not member_id:
+            return rx.toast.error("Bitte melde dich an.")
+        try:
+            for value in (self.export_start, self.export_end):
+                if value:
+                    date.fromisoformat(value)
+        except ValueError:
+            return rx.toast.error("Ungültiges Datum.")
+        url = export_url(
+            member_id,
+            start=self.export_start,
+            end=self.export_end,
+            category=self.export_category,
+            # The export follows the member search of the listing.
+            name=self.search_query.strip(),
+        )
+        return rx.call_script(f"window.location.href = {json.dumps(url)}")
 
     @rx.var
     def total_spent_all(self) -> float:
-        if not self.all_costs:
-            return 0.0
-        return sum((c["amount"] for c in self.all_costs))
+        return from_cents(self.summary["total_cents"])
 
     @rx.var
     def total_costs_all(self) -> int:
-        return len(self.all_costs)
+        return self.summary["count"]
 
     @rx.var
     def average_cost_all(self) -> float:
@@ -38,67 +91,123 @@ class AllCostsState(BaseState):
 
     @rx.var
     def total_members(self) -> int:
-        if not self.all_costs:
-            return 0
-        return len({c["member_id"] for c in self.all_costs})
+        return self.summary["members"]
 
-    @rx.var
-    def filtered_costs(self) -> list[CostWithMember]:
-        """Filter costs based on the search query."""
-        if not self.search_query.strip():
-            return self.all_costs
-        query = self.search_query.lower()
-        return [cost for cost in self.all_costs if query in cost["member_name"].lower()]
+    def _filtered(self, query):
+        """Apply the member name search to a Cost/Member select."""
+        if self.search_query.strip():
+            query = query.where(member_name_contains(self.search_query.strip()))
+        return query
 
-    @rx.var
-    def filtered_costs_by_week(
-        self,
-    ) -> list[tuple[str, list[tuple[str, list[CostWithMember], float]], float]]:
-        grouped = defaultdict(lambda: defaultdict(list))
-        for cost in self.filtered_costs:
-            try:
-                cost_date = datetime.strptime(cost["date"], "%Y-%m-%d")
-                start_of_week = cost_date - timedelta(days=cost_date.weekday())
-                week_key = start_of_week.strftime("%Y-%m-%d")
-                grouped[week_key][cost["member_name"]].append(cost)
-            except ValueError as e:
-                logging.exception(f"Error parsing date for cost: {cost}. Error: {e}")
-                continue
-        result = []
-        sorted_weeks = sorted(grouped.keys(), reverse=True)
-        for week in sorted_weeks:
-            week_total = 0.0
-            members_data = []
-            sorted_members = sorted(grouped[week].keys())
-            for member_name in sorted_members:
-                member_costs = grouped[week][member_name]
-                member_costs.sort(key=lambda x: x["date"], reverse=True)
-                member_subtotal = sum((c["amount"] for c in member_costs))
-                members_data.append((member_name, member_costs, member_subtotal))
-                week_total += member_subtotal
-            result.append((week, members_data, week_total))
-        return result
+    def _before_cursor(self):
+        """Keyset condition selecting rows older than the last loaded one."""
+        cursor_date = date.fromisoformat(self.cursor_date)
+        return or_(
+            Cost.date < cursor_date,
+            and_(Cost.date == cursor_date, Cost.id < self.cursor_id),
+        )
 
-    @rx.event
-    async def get_all_costs(self):
-        auth_state = await self.get_state(MyAuthState)
-        if not auth_state.is_authenticated:
-            return
-        with db_session() as session:
-            results = session.exec(
+    async def _reset_and_load(self):
+        self.cost_weeks = []
+        self.cursor_date = ""
+        self.cursor_id = 0
+        self.has_more_weeks = True
+        async with async_db_session() as session:
+            self.summary = await cost_summary(session, name_query=self.search_query)
+        await self._load_next_week()
+
+    async def _load_next_week(self):
+        """Append the next older week of costs, walking (date, id) downwards.
+
+        The newest row before the cursor decides which week comes next, then
+        that week is fetched as one range scan on the date index. Member
+        subtotals and the week total come from the weekly rollup.
+        """
+        async with async_db_session() as session:
+            newest = select(Cost.date).join(Member, Cost.member_id == Member.id)
+            if self.cursor_date:
+                newest = newest.where(self._before_cursor())
+            newest_date = (
+                await session.exec(
+                    self._filtered(newest)
+                    .order_by(Cost.date.desc(), Cost.id.desc())
+                    .limit(1)
+                )
+            ).first()
+            if newest_date is None:
+                self.has_more_weeks = False
+                return
+            week_start = week_start_of(newest_date)
+            week_query = (
                 select(Cost, Member.name)
                 .join(Member, Cost.member_id == Member.id)
-                .order_by(Cost.date.desc(), Member.name.asc())
+                .where(
+                    Cost.date >= week_start, Cost.date < week_start + timedelta(days=7)
+                )
+            )
+            if self.cursor_date:
+                week_query = week_query.where(self._before_cursor())
+            results = (
+                await session.exec(
+                    self._filtered(week_query).order_by(
+                        Cost.date.desc(), Cost.id.desc()
+                    )
+                )
             ).all()
-            self.all_costs = [
+            subtotals = (
+                await session.exec(
+                    self._filtered(
+                        select(
+                            WeeklyCostRollup.member_id,
+                            Member.name,
+                            func.sum(WeeklyCostRollup.amount_cents),
+                        )
+                        .join(Member, WeeklyCostRollup.member_id == Member.id)
+                        .where(WeeklyCostRollup.week_start == week_start)
+                        .group_by(WeeklyCostRollup.member_id, Member.name)
+                        .order_by(Member.name)
+                    )
+                )
+            ).all()
+        week_key = week_start.isoformat()
+        costs_by_member: dict[int, list[CostWithMember]] = defaultdict(list)
+        for cost, member_name in results:
+            costs_by_member[cost.member_id].append(
                 {
                     "id": cost.id,
                     "description": cost.description,
-                    "amount": cost.amount,
-                    "date": cost.date,
+                    "amount": from_cents(cost.amount_cents),
+                    "amount_cents": cost.amount_cents,
+                    "date": cost.date.isoformat(),
+                    "week_start": week_key,
                     "category": cost.category,
                     "member_id": cost.member_id,
                     "member_name": member_name,
                 }
-                for cost, member_name in results
-            ]
\ No newline at end of file
+            )
+        members_data = [
+            (member_name, costs_by_member[member_id], from_cents(subtotal_cents))
+            for member_id, member_name, subtotal_cents in subtotals
+        ]
+        week_total_cents = sum((subtotal for _, _, subtotal in subtotals))
+        self.cost_weeks = self.cost_weeks + [
+            (week_key, members_data, from_cents(week_total_cents))
+        ]
+        last_cost = results[-1][0]
+        self.cursor_date = last_cost.date.isoformat()
+        self.cursor_id = last_cost.id
+
+    @rx.event
+    async def get_all_costs(self):
+        if not self._member_id():
+            return
+        await self._reset_and_load()
+
+    @rx.event
+    async def load_older_week(self):
+        """Fetch the next older week for the infinite-scroll listing."""
+        if not self.has_more_weeks:
+            return
+        if not self._member_id():
+            return
+        await self._load_next_week()
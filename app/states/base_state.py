@@ -1,7 +1,18 @@
 import reflex as rx
+from app.models import CurrentUser
+from app.security import verify_session_token
 
 
 class BaseState(rx.State):
     """The base state for the app."""
 
-    pass
\ No newline at end of file
+    session_token: str = rx.LocalStorage("", name="kassen_session", sync=True)
+
+    def _session_user(self) -> CurrentUser | None:
+        """The logged-in member from the session token, without loading substates."""
+        return verify_session_token(self.session_token)
+
+    def _member_id(self) -> int:
+        """Id of the logged-in member, 0 when nobody is logged in."""
+        user = self._session_user()
+        return user["id"] if user else 0
@@ -1,15 +1,28 @@
 import reflex as rx
+import json
 import logging
 from sqlmodel import select
 from .base_state import BaseState
-from app.models import Cost, CostForm
-from .auth_state import MyAuthState
-from app.database import db_session
-from datetime import datetime
+from app.models import (
+    QUICK_DRINKS,
+    Cost,
+    CostForm,
+    CostSummary,
+    from_cents,
+    serialize_cost,
+    to_cents,
+)
+from app.aggregates import EMPTY_SUMMARY, cost_summary, invalidate_cost_summaries
+from app.database import async_db_session
+from app.export import export_url
+from app.journal import settle_cost
+from app.rollup import record_cost
+from datetime import date, datetime
 
 
 class CostState(BaseState):
     costs: list[dict] = []
+    summary: CostSummary = EMPTY_SUMMARY
     categories: dict[str, float | None] = {
         "Getränke (nicht-alkoholisch) - €1.50": 1.5,
         "Getränke (alkoholisch) - €2.50": 2.5,
@@ -20,13 +33,11 @@ class CostState(BaseState):
 
     @rx.var
     def total_spent(self) -> float:
-        if not self.costs:
-            return 0.0
-        return sum((c["amount"] for c in self.costs))
+        return from_cents(self.summary["total_cents"])
 
     @rx.var
     def total_costs(self) -> int:
-        return len(self.costs)
+        return self.summary["count"]
 
     @rx.var
     def average_cost(self) -> float:
@@ -36,31 +47,59 @@ class CostState(BaseState):
     def today_date(self) -> str:
         return datetime.now().strftime("%Y-%m-%d")
 
+    @rx.event
+    def export_costs(self):
+        """Start the CSV download of the member's own costs."""
+        member_id = self._member_id()
+        if not member_id:
+            return rx.toast.error("Bitte melde dich an.")
+        url = export_url(member_id, member_id=member_id)
+        return rx.call_script(f"window.location.href = {json.dumps(url)}")
+
     @rx.var
     def is_custom_category(self) -> bool:
         return self.form_category == "Anderes"
 
+    def _insert_cost_row(self, row: dict):
+        """Insert a row into self.costs keeping (date, id) descending order."""
+        key = (row["date"], row["id"])
+        index = next(
+            (i for i, c in enumerate(self.costs) if (c["date"], c["id"]) < key),
+            len(self.costs),
+        )
+        self.costs = self.costs[:index] + [row] + self.costs[index:]
+
+    async def _refresh_summary(self, member_id: int) -> bool:
+        """Reload the summary and report whether self.costs is still in sync.
+
+        The summary count is the version check: if another terminal booked
+        for this member meanwhile, it no longer matches the patched list.
+        """
+        await invalidate_cost_summaries()
+        async with async_db_session() as session:
+            self.summary = await cost_summary(session, member_id=member_id)
+        return self.summary["count"] == len(self.costs)
+
     @rx.event
     async def get_costs(self):
-        auth_state = await self.get_state(MyAuthState)
-        if not auth_state.is_authenticated:
+        member_id = self._member_id()
+        if not member_id:
             return
-        current_user = auth_state.current_user
-        member_id = (
-            current_user["id"] if isinstance(current_user, dict) else current_user.id
-        )
-        with db_session() as session:
-            results = session.exec(
-                select(Cost)
-                .where(Cost.member_id == member_id)
-                .order_by(Cost.date.desc())
+        async with async_db_session() as session:
+            results = (
+                await session.exec(
+                    select(Cost)
+                    .where(Cost.member_id == member_id)
+                    .order_by(Cost.date.desc(), Cost.id.desc())
+                )
             ).all()
-            self.costs = [cost.model_dump() for cost in results]
+            self.costs = [serialize_cost(cost) for cost in results]
+            self.summary = await cost_summary(session, member_id=member_id)
 
     @rx.event
     async def add_cost(self, form_data: dict):
-        auth_state = await self.get_state(MyAuthState)
-        if not auth_state.is_authenticated:
+        user = self._session_user()
+        if user is None:
             yield rx.toast.error("You must be logged in to add a cost.")
             return
         form = CostForm(
@@ -72,86 +111,88 @@ class CostState(BaseState):
         if not form["date"] or not form["category"]:
             yield rx.toast.error("Date and Category are required.")
             return
-        amount: float
+        try:
+            cost_date = date.fromisoformat(form["date"])
+        except ValueError:
+            yield rx.toast.error("Invalid date.")
+            return
+        amount_cents: int
         category_value = self.categories.get(form["category"])
         if form["category"] == "Anderes":
             if not form["amount"]:
                 yield rx.toast.error("Amount is required for Anderes category.")
                 return
             try:
-                amount = float(form["amount"])
+                amount_cents = to_cents(float(form["amount"]))
             except (ValueError, TypeError) as e:
                 logging.exception(f"Error converting amount to float: {e}")
                 yield rx.toast.error("Invalid amount. Please enter a number.")
                 return
         elif category_value is not None:
-            amount = category_value
+            amount_cents = to_cents(category_value)
         else:
             yield rx.toast.error("Invalid category selected.")
             return
-        with db_session() as session:
-            current_user = auth_state.current_user
-            member_id = (
-                current_user["id"]
-                if isinstance(current_user, dict)
-                else current_user.id
-            )
+        async with async_db_session() as session:
+            member_id = user["id"]
             new_cost = Cost(
                 description=form["description"],
-                amount=amount,
-                date=form["date"],
+                amount_cents=amount_cents,
+                date=cost_date,
                 category=form["category"],
                 member_id=member_id,
             )
             session.add(new_cost)
-            session.commit()
+            await record_cost(session, new_cost)
+            await session.commit()
+        self._insert_cost_row(serialize_cost(new_cost))
         self.form_category = ""
         self.form_amount = ""
-        yield CostState.get_costs
+        if not await self._refresh_summary(member_id):
+            yield CostState.get_costs
         yield rx.toast.success("Cost added successfully!")
 
     @rx.event
     async def add_quick_drink(self, drink_type: str):
-        auth_state = await self.get_state(MyAuthState)
-        if not auth_state.is_authenticated:
+        user = self._session_user()
+        if user is None:
             yield rx.toast.error("You must be logged in to add a cost.")
             return
-        if drink_type == "non-alcoholic":
-            category = "Getränke (nicht-alkoholisch) - €1.50"
-            amount = 1.5
-            description = "Nicht-alkoholisches Getränk"
-        elif drink_type == "alcoholic":
-            category = "Getränke (alkoholisch) - €2.50"
-            amount = 2.5
-            description = "Alkoholisches Getränk"
-        else:
+        drink = QUICK_DRINKS.get(drink_type)
+        if drink is None:
             yield rx.toast.error("Invalid drink type.")
             return
-        with db_session() as session:
-            current_user = auth_state.current_user
-            member_id = (
-                current_user["id"]
-                if isinstance(current_user, dict)
-                else current_user.id
-            )
+        description = drink["description"]
+        async with async_db_session() as session:
+            member_id = user["id"]
             new_cost = Cost(
                 description=description,
-                amount=amount,
-                date=self.today_date,
-                category=category,
+                amount_cents=to_cents(drink["amount"]),
+                date=date.today(),
+                category=drink["category"],
                 member_id=member_id,
             )
             session.add(new_cost)
-            session.commit()
-        yield CostState.get_costs
+            await record_cost(session, new_cost)
+            await session.commit()
+        self._insert_cost_row(serialize_cost(new_cost))
+        if not await self._refresh_summary(member_id):
+            yield CostState.get_costs
         yield rx.toast.success(f"{description} added!")
 
     @rx.event
-    def delete_cost(self, cost_id: int):
-        with db_session() as session:
-            cost_to_delete = session.get(Cost, cost_id)
+    async def delete_cost(self, cost_id: int):
+        member_id = self._member_id()
+        if not member_id:
+            return
+        async with async_db_session() as session:
+            cost_to_delete = await session.get(Cost, cost_id)
             if cost_to_delete:
-                session.delete(cost_to_delete)
-                session.commit()
-        yield CostState.get_costs
-        yield rx.toast.info("Cost deleted.")
\ No newline at end of file
+                await session.delete(cost_to_delete)
+                await record_cost(session, cost_to_delete, sign=-1)
+                await settle_cost(session, cost_id)
+                await session.commit()
+        self.costs = [c for c in self.costs if c["id"] != cost_id]
+        if not await self._refresh_summary(member_id):
+            yield CostState.get_costs
+        yield rx.toast.info("Cost deleted.")
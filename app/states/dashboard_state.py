@@ -0,0 +1,59 @@
+import reflex as rx
+from .base_state import BaseState
+from app.models import CategoryShare, DashboardSeries, MonthlySpending, from_cents
+from app.aggregates import EMPTY_DASHBOARD, dashboard_series
+from app.database import async_db_session
+
+DASHBOARD_MONTHS = (12, 24, 60)
+
+
+class DashboardState(BaseState):
+    months: int = DASHBOARD_MONTHS[0]
+    own_costs_only: bool = False
+    series: DashboardSeries = EMPTY_DASHBOARD
+
+    @rx.var
+    def monthly(self) -> list[MonthlySpending]:
+        return self.series["monthly"]
+
+    @rx.var
+    def category_shares(self) -> list[CategoryShare]:
+        return self.series["categories"]
+
+    @rx.var
+    def total_spent(self) -> float:
+        return from_cents(self.series["total_cents"])
+
+    @rx.var
+    def total_count(self) -> int:
+        return self.series["count"]
+
+    @rx.var
+    def average_per_month(self) -> float:
+        return round(self.total_spent / self.months, 2)
+
+    @rx.event
+    async def load_dashboard(self):
+        member_id = self._member_id()
+        if not member_id:
+            return
+        async with async_db_session() as session:
+            self.series = await dashboard_series(
+                session, self.months, member_id if self.own_costs_only else None
+            )
+
+    @rx.event
+    async def set_months(self, value: str):
+        try:
+            months = int(value)
+        except ValueError:
+            return
+        if months not in DASHBOARD_MONTHS:
+            return
+        self.months = months
+        await self.load_dashboard()
+
+    @rx.event
+    async def toggle_own_costs_only(self):
+        self.own_costs_only = not self.own_costs_only
+        await self.load_dashboard()
@@ -0,0 +1,78 @@
+import reflex as rx
+from .base_state import BaseState
+from app.aggregates import invalidate_cost_summaries
+from app.database import db_session
+from app.importer import ImportAborted, ImportResult, import_costs
+from pathlib import Path
+import asyncio
+import logging
+import uuid
+
+# Rejects listed on the page; the counts cover all of them.
+SHOWN_REJECTS = 50
+
+
+def _import_file(path: Path):
+    with open(path, newline="", encoding="utf-8-sig") as lines, db_session() as session:
+        return import_costs(session, lines)
+
+
+class ImportState(BaseState):
+    importing: bool = False
+    imported_count: int = 0
+    rejected_count: int = 0
+    rejects: list[tuple[int, str]] = []
+    import_error: str = ""
+    upload_path: str = ""
+
+    def _is_admin(self) -> bool:
+        user = self._session_user()
+        return user is not None and user["email"] == "acf@admin.com"
+
+    @rx.event
+    async def handle_upload(self, files: list[rx.UploadFile]):
+        """Store the uploaded CSV and import it in the background."""
+        if not self._is_admin():
+            yield rx.toast.error("Nur der Admin kann Kosten importieren.")
+            return
+        if self.importing or not files:
+            return
+        path = rx.get_upload_dir() / f"import-{uuid.uuid4().hex}.csv"
+        with open(path, "wb") as target:
+            while chunk := await files[0].read(1024 * 1024):
+                target.write(chunk)
+        self.upload_path = str(path)
+        self.importing = True
+        self.import_error = ""
+        yield ImportState.run_import
+
+    @rx.event(background=True)
+    async def run_import(self):
+        async with self:
+            path = Path(self.upload_path)
+        error = ""
+        try:
+            result = await asyncio.to_thread(_import_file, path)
+        except ImportAborted as aborted:
+            logging.exception("Cost import aborted.")
+            result, error = aborted.result, str(aborted)
+        except Exception as failure:
+            # A bad header or encoding; nothing was written.
+            result, error = ImportResult(), str(failure)
+        finally:
+            path.unlink(missing_ok=True)
+        if result.imported:
+            await invalidate_cost_summaries()
+        async with self:
+            self.import_error = error
+            self.imported_count = result.imported
+            self.rejected_count = result.rejected
+            self.rejects = [
+                (reject.line, reject.reason)
+                for reject in result.rejects[:SHOWN_REJECTS]
+            ]
+            self.importing = False
+        if error:
+            yield rx.toast.error(error)
+        else:
+            yield rx.toast.success(f"{result.imported} Kosten importiert.")
@@ -1,85 +1,150 @@
 import reflex as rx
-from sqlmodel import select
+from sqlmodel import and_, or_, select
 from .base_state import BaseState
 from app.models import Notification
-from .auth_state import MyAuthState
-from app.database import db_session
+from app.database import async_db_session
+from app.notifications import mark_all_read, mark_read, notification_hub, unread_count
+from reflex.utils import prerequisites
 from datetime import datetime
 from typing import cast
 
+NOTIFICATION_PAGE_SIZE = 20
+# A watcher re-checks its session this often even without new notifications.
+NOTIFICATION_WATCH_TIMEOUT = 60
+
+
+def _client_connected(client_token: str) -> bool:
+    namespace = prerequisites.get_and_validate_app().app.event_namespace
+    return namespace is not None and client_token in namespace.token_to_sid
+
 
 class NotificationState(BaseState):
     notifications: list[Notification] = []
+    unread_count: int = 0
+    has_more_notifications: bool = False
     show_notifications: bool = False
 
-    def _is_notification_unread(self, notification: Notification | dict) -> bool:
-        """Safely checks if a notification is unread, handling both objects and dicts."""
-        if isinstance(notification, dict):
-            return not notification.get("is_read", True)
-        return not notification.is_read
-
-    @rx.var
-    def unread_count(self) -> int:
-        return sum((1 for n in self.notifications if self._is_notification_unread(n)))
-
     @rx.event
     def toggle_notifications(self):
         self.show_notifications = not self.show_notifications
 
+    async def _page(self, session, member_id: int, after: Notification | None):
+        """The next page of a member's notifications, newest first.
+
+        Paging continues from the last loaded row on (created_at, id), so
+        notifications arriving meanwhile do not shift the pages.
+        """
+        query = select(Notification).where(Notification.member_id == member_id)
+        if after is not None:
+            query = query.where(
+                or_(
+                    Notification.created_at < after.created_at,
+                    and_(
+                        Notification.created_at == after.created_at,
+                        Notification.id < after.id,
+                    ),
+                )
+            )
+        rows = (
+            await session.exec(
+                query.order_by(
+                    Notification.created_at.desc(), Notification.id.desc()
+                ).limit(NOTIFICATION_PAGE_SIZE + 1)
+            )
+        ).all()
+        self.has_more_notifications = len(rows) > NOTIFICATION_PAGE_SIZE
+        return list(rows[:NOTIFICATION_PAGE_SIZE])
+
     @rx.event
     async def load_notifications(self):
-        auth_state = await self.get_state(MyAuthState)
-        if not auth_state.is_authenticated:
-            return
-        current_user = auth_state.current_user
-        member_id = (
-            current_user["id"] if isinstance(current_user, dict) else current_user.id
-        )
+        member_id = self._member_id()
         if not member_id:
             return
-        with db_session() as session:
-            results = session.exec(
-                select(Notification)
-                .where(Notification.member_id == member_id)
-                .order_by(Notification.created_at.desc())
-                .limit(20)
-            ).all()
-            self.notifications = results
+        async with async_db_session() as session:
+            self.notifications = await self._page(session, member_id, None)
+            self.unread_count = await unread_count(session, member_id)
 
     @rx.event
-    def mark_as_read(self, notification_id: int):
-        with db_session() as session:
-            db_notification = session.get(Notification, notification_id)
-            if db_notification and (not db_notification.is_read):
-                db_notification.is_read = True
-                session.add(db_notification)
-                session.commit()
-                session.refresh(db_notification)
-                for i, n in enumerate(self.notifications):
-                    if n.id == notification_id:
-                        self.notifications[i] = db_notification
-                        break
+    async def load_more_notifications(self):
+        member_id = self._member_id()
+        if not member_id or not self.notifications:
+            return
+        async with async_db_session() as session:
+            self.notifications = self.notifications + await self._page(
+                session, member_id, self.notifications[-1]
+            )
 
-    @rx.event
-    async def mark_all_as_read(self):
-        auth_state = await self.get_state(MyAuthState)
-        if not auth_state.is_authenticated:
+    async def _refresh_newest(self, member_id: int):
+        """Reload the first page and the counter after a push."""
+        async with async_db_session() as session:
+            newest = await self._page(session, member_id, None)
+            count = await unread_count(session, member_id)
+        if len(self.notifications) > NOTIFICATION_PAGE_SIZE:
+            # Keep the pages loaded further down, minus rows now on page one.
+            seen = {notification.id for notification in newest}
+            newest += [
+                notification
+                for notification in self.notifications[NOTIFICATION_PAGE_SIZE:]
+                if notification.id not in seen
+            ]
+            self.has_more_notifications = True
+        self.notifications = newest
+        self.unread_count = count
+
+    @rx.event(background=True)
+    async def watch_notifications(self):
+        """Push new notifications and the badge count to this open session."""
+        client_token = self.router.session.client_token
+        async with self:
+            member_id = self._member_id()
+        if not member_id or client_token in notification_hub.watching:
             return
-        current_user = auth_state.current_user
-        member_id = (
-            current_user["id"] if isinstance(current_user, dict) else current_user.id
-        )
+        notification_hub.watching.add(client_token)
+        try:
+            version = notification_hub.version(member_id)
+            while _client_connected(client_token):
+                changed = await notification_hub.wait(
+                    member_id, version, NOTIFICATION_WATCH_TIMEOUT
+                )
+                version = notification_hub.version(member_id)
+                async with self:
+                    if self._member_id() != member_id:
+                        # Logged out or switched user; the next mount restarts.
+                        return
+                    if changed:
+                        await self._refresh_newest(member_id)
+        finally:
+            notification_hub.watching.discard(client_token)
+
+    @rx.event
+    async def mark_as_read(self, notification_id: int):
+        member_id = self._member_id()
         if not member_id:
             return
-        with db_session() as session:
-            unread_notifications = session.exec(
-                select(Notification).where(
-                    Notification.member_id == member_id, Notification.is_read == False
+        async with async_db_session() as session:
+            if not await mark_read(session, member_id, notification_id):
+                return
+            await session.commit()
+            self.unread_count = await unread_count(session, member_id)
+        for i, n in enumerate(self.notifications):
+            if n.id == notification_id:
+                self.notifications[i] = Notification.model_validate(
+                    {**n.model_dump(), "is_read": True}
                 )
-            ).all()
-            for notification in unread_notifications:
-                notification.is_read = True
-                session.add(notification)
-            if unread_notifications:
-                session.commit()
-        yield NotificationState.load_notifications
\ No newline at end of file
+                break
+        await notification_hub.notify([member_id])
+
+    @rx.event
+    async def mark_all_as_read(self):
+        member_id = self._member_id()
+        if not member_id:
+            return
+        async with async_db_session() as session:
+            await mark_all_read(session, member_id)
+            await session.commit()
+        self.unread_count = 0
+        self.notifications = [
+            Notification.model_validate({**n.model_dump(), "is_read": True})
+            for n in self.notifications
+        ]
+        await notification_hub.notify([member_id])
@@ -1,16 +1,24 @@
 import reflex as rx
-from sqlmodel import select
 from .base_state import BaseState
-from app.models import Member, Cost, Notification
-from .auth_state import MyAuthState
-from app.database import db_session
-from datetime import datetime
+from app.models import MemberEntry, Cost, QUICK_DRINKS, to_cents
+from app.aggregates import invalidate_cost_summaries
+from app.database import async_db_session
+from app.member_directory import member_directory
+from app.journal import MAX_UNDO, undo_bookings
+from app.notifications import booking_notification, notification_hub
+from app.write_queue import Booking, write_booking
+from datetime import date, datetime
+from uuid import uuid4
 import logging
 
 
 class QuickEntryState(BaseState):
-    members: list[Member] = []
+    members: list[MemberEntry] = []
     search_query: str = ""
+    # Ranked ids of the members matching search_query.
+    search_ids: list[int] = []
+    # Directory generation of `members`; backend-only, never sent.
+    _members_generation: int = -1
     categories: dict[str, float | None] = {
         "Getränke (nicht-alkoholisch) - €1.50": 1.5,
         "Getränke (alkoholisch) - €2.50": 2.5,
@@ -27,33 +35,72 @@ class QuickEntryState(BaseState):
         "item_name": "",
         "amount": "",
     }
-    last_booking_id: int = -1
-    last_notification_id: int = -1
-    last_booking_timestamp: datetime | None = None
+    # Sent back with every booking; a tap repeated before the page received
+    # the next key is recognised as a retry, see app/journal.py.
+    booking_key: str = ""
+    # How many of the operator's last bookings the undo button reverts.
+    undo_count: int = 1
+    # "1" while /tile-entry books through the offline queue, per device.
+    offline_mode: str = rx.LocalStorage("", name="kassen_offline_mode", sync=True)
 
     @rx.var
-    def selected_member(self) -> Member:
+    def selected_member(self) -> MemberEntry:
         return next(
-            (m for m in self.members if m.id == self.selected_member_id),
-            Member(id=0, name="", email="", password=""),
+            (m for m in self.members if m["id"] == self.selected_member_id),
+            {"id": 0, "name": "", "first_name": "", "initials": "", "sort_key": ""},
         )
 
+    def _blank_form(self) -> dict[str, str]:
+        return {
+            "category": "",
+            "amount": "",
+            "description": "",
+            "date": self.today_date,
+        }
+
+    def _discard_form(self, member_id: int):
+        """Drop a member's form unless its quick-entry row is still open."""
+        if member_id in self.form_states and member_id not in self.open_forms:
+            self.form_states = {
+                mid: form for mid, form in self.form_states.items() if mid != member_id
+            }
+
     @rx.event
     def open_selection(self, member_id: int):
+        # Only open rows and the selected member keep a form.
+        self.form_states = {
+            mid: form
+            for mid, form in self.form_states.items()
+            if mid in self.open_forms or mid == member_id
+        }
         self.selected_member_id = member_id
         self.is_selection_open = True
         self.is_custom_form_visible = False
         if member_id not in self.form_states:
-            self.form_states[member_id] = {
-                "category": "",
-                "amount": "",
-                "description": "",
-                "date": self.today_date,
-            }
+            self.form_states[member_id] = self._blank_form()
 
     @rx.event
     def close_selection(self):
         self.is_selection_open = False
+        self._discard_form(self.selected_member_id)
+
+    @rx.event
+    def set_selection_open(self, is_open: bool):
+        self.is_selection_open = is_open
+        if not is_open:
+            self._discard_form(self.selected_member_id)
+
+    @rx.event
+    def set_undo_count(self, value: str):
+        try:
+            count = int(value)
+        except ValueError:
+            return
+        self.undo_count = min(max(count, 1), MAX_UNDO)
+
+    @rx.event
+    def toggle_offline_mode(self):
+        self.offline_mode = "" if self.offline_mode == "1" else "1"
 
     @rx.event
     def toggle_custom_form(self):
@@ -67,51 +114,61 @@ class QuickEntryState(BaseState):
     def toggle_form(self, member_id: int):
         if member_id in self.open_forms:
             self.open_forms = [mid for mid in self.open_forms if mid != member_id]
+            if member_id != self.selected_member_id or not self.is_selection_open:
+                self._discard_form(member_id)
         else:
             self.open_forms = self.open_forms + [member_id]
+            if member_id not in self.form_states:
+                self.form_states[member_id] = self._blank_form()
 
     @rx.var
     def today_date(self) -> str:
         return datetime.now().strftime("%Y-%m-%d")
 
     @rx.event
-    def set_search_query(self, query: str):
+    async def set_search_query(self, query: str):
         """Sets the search query for filtering members."""
         self.search_query = query
+        await self._load_members()
 
     @rx.var
-    def filtered_members(self) -> list[Member]:
-        """Filters members based on the search query."""
+    def filtered_members(self) -> list[MemberEntry]:
+        """Members matching the search query, best matches first."""
         if not self.search_query.strip():
             return self.members
-        query = self.search_query.lower()
-        return [member for member in self.members if query in member.name.lower()]
+        by_id = {member["id"]: member for member in self.members}
+        return [by_id[member_id] for member_id in self.search_ids if member_id in by_id]
+
+    async def _load_members(self):
+        members = await member_directory.members()
+        # Assigning marks the var dirty and resends the whole list, so only
+        # do it when the directory changed.
+        if self._members_generation != member_directory.generation:
+            self.members = members
+            self._members_generation = member_directory.generation
+        self.search_ids = (
+            await member_directory.search(self.search_query)
+            if self.search_query.strip()
+            else []
+        )
 
     @rx.event
-    def get_all_members(self):
-        with db_session() as session:
-            self.members = session.exec(
-                select(Member)
-                .where(Member.email != "acf@admin.com")
-                .order_by(Member.name)
-            ).all()
-            for member in self.members:
-                if member.id not in self.form_states:
-                    self.form_states[member.id] = {
-                        "category": "",
-                        "amount": "",
-                        "description": "",
-                        "date": self.today_date,
-                    }
+    async def get_all_members(self):
+        await self._load_members()
+        if not self.booking_key:
+            self.booking_key = uuid4().hex
 
-    @rx.var
-    def get_form_state(self) -> dict[int, dict[str, str]]:
-        return self.form_states
+    @staticmethod
+    def _idempotency_key(booking_key: str, member_id: int, item: str) -> str | None:
+        """One key per button, so quick taps on different buttons all count."""
+        if not booking_key:
+            return None
+        return f"{booking_key}:{member_id}:{item}"
 
     @rx.event
     def set_form_field(self, member_id: int, field: str, value: str):
         if member_id not in self.form_states:
-            self.form_states[member_id] = {}
+            self.form_states[member_id] = self._blank_form()
         self.form_states[member_id][field] = value
         if field == "category":
             category_price = self.categories.get(value)
@@ -121,19 +178,24 @@ class QuickEntryState(BaseState):
                 self.form_states[member_id]["amount"] = ""
 
     @rx.event
-    async def add_cost_for_member(self, member_id: int):
-        auth_state = await self.get_state(MyAuthState)
-        if not auth_state.is_authenticated:
+    async def add_cost_for_member(self, member_id: int, booking_key: str = ""):
+        user = self._session_user()
+        if user is None:
             yield rx.toast.error("You must be logged in.")
             return
         form_data = self.form_states.get(member_id, {})
         category = form_data.get("category", "")
         amount_str = form_data.get("amount", "")
-        date = form_data.get("date", self.today_date)
+        date_str = form_data.get("date", self.today_date)
         description = form_data.get("description", "")
         if not category:
             yield rx.toast.error("Category is required.")
             return
+        try:
+            cost_date = date.fromisoformat(date_str)
+        except ValueError:
+            yield rx.toast.error("Invalid date.")
+            return
         amount: float
         category_value = self.categories.get(category)
         if category == "Anderes":
@@ -142,63 +204,48 @@ class QuickEntryState(BaseState):
                 return
             try:
                 amount = float(amount_str)
+                amount_cents = to_cents(amount)
             except (ValueError, TypeError) as e:
                 logging.exception(f"Error converting amount to float: {e}")
                 yield rx.toast.error("Invalid amount.")
                 return
         elif category_value is not None:
             amount = category_value
+            amount_cents = to_cents(amount)
         else:
             yield rx.toast.error("Invalid category selected.")
             return
-        with db_session() as session:
-            new_cost = Cost(
-                description=description,
-                amount=amount,
-                date=date,
-                category=category,
-                member_id=member_id,
-            )
-            session.add(new_cost)
-            member_name = ""
-            for m in self.members:
-                if m.id == member_id:
-                    member_name = m.name.split()[0]
-                    break
-            auth_user = auth_state.current_user
-            auth_user_id = (
-                auth_user.get("id") if isinstance(auth_user, dict) else auth_user.id
-            )
-            auth_user_name = (
-                auth_user.get("name") if isinstance(auth_user, dict) else auth_user.name
+        new_cost = Cost(
+            description=description,
+            amount_cents=amount_cents,
+            date=cost_date,
+            category=category,
+            member_id=member_id,
+        )
+        member_name = ""
+        for m in self.members:
+            if m["id"] == member_id:
+                member_name = m["first_name"]
+                break
+        new_notification = None
+        if user["id"] != member_id:
+            new_notification = booking_notification(user, new_cost)
+        booking = await write_booking(
+            Booking(
+                new_cost,
+                new_notification,
+                user["id"],
+                self._idempotency_key(booking_key, member_id, "cost"),
             )
-            new_notification = None
-            if auth_user_id != member_id:
-                notification_message = (
-                    f"{auth_user_name} hat Kosten (€{amount:.2f}) für dich hinzugefügt."
-                )
-                new_notification = Notification(
-                    member_id=member_id, message=notification_message
-                )
-                session.add(new_notification)
-                yield rx.toast.info(f"Benachrichtigung an {member_name} gesendet.")
-            session.commit()
-            session.refresh(new_cost)
-            self.last_booking_id = new_cost.id
-            self.last_booking_timestamp = datetime.now()
-            if new_notification:
-                session.refresh(new_notification)
-                self.last_notification_id = new_notification.id
-            else:
-                self.last_notification_id = -1
-        self.form_states[member_id] = {
-            "category": "",
-            "amount": "",
-            "description": "",
-            "date": self.today_date,
-        }
+        )
+        self.booking_key = uuid4().hex
+        if booking.duplicate:
+            return
+        if new_notification:
+            yield rx.toast.info(f"Benachrichtigung an {member_name} gesendet.")
         if member_id in self.open_forms:
             self.open_forms = [mid for mid in self.open_forms if mid != member_id]
+        self._discard_form(member_id)
         self.confirmation_details = {
             "member_name": member_name,
             "item_name": description if description else category,
@@ -210,62 +257,48 @@ class QuickEntryState(BaseState):
         return
 
     @rx.event
-    async def add_quick_drink_for_member(self, member_id: int, drink_type: str):
-        auth_state = await self.get_state(MyAuthState)
-        if not auth_state.is_authenticated:
+    async def add_quick_drink_for_member(
+        self, member_id: int, drink_type: str, booking_key: str = ""
+    ):
+        user = self._session_user()
+        if user is None:
             yield rx.toast.error("You must be logged in.")
             return
-        if drink_type == "non-alcoholic":
-            category = "Getränke (nicht-alkoholisch) - €1.50"
-            amount = 1.5
-            description = "Nicht-alkoholisches Getränk"
-        elif drink_type == "alcoholic":
-            category = "Getränke (alkoholisch) - €2.50"
-            amount = 2.5
-            description = "Alkoholisches Getränk"
-        else:
+        drink = QUICK_DRINKS.get(drink_type)
+        if drink is None:
             yield rx.toast.error("Invalid drink type.")
             return
-        with db_session() as session:
-            new_cost = Cost(
-                description=description,
-                amount=amount,
-                date=self.today_date,
-                category=category,
-                member_id=member_id,
-            )
-            session.add(new_cost)
-            member_name = ""
-            for m in self.members:
-                if m.id == member_id:
-                    member_name = m.name.split()[0]
-                    break
-            auth_user = auth_state.current_user
-            auth_user_id = (
-                auth_user.get("id") if isinstance(auth_user, dict) else auth_user.id
-            )
-            auth_user_name = (
-                auth_user.get("name") if isinstance(auth_user, dict) else auth_user.name
+        category = drink["category"]
+        amount = drink["amount"]
+        description = drink["description"]
+        new_cost = Cost(
+            description=description,
+            amount_cents=to_cents(amount),
+            date=date.today(),
+            category=category,
+            member_id=member_id,
+        )
+        member_name = ""
+        for m in self.members:
+            if m["id"] == member_id:
+                member_name = m["first_name"]
+                break
+        new_notification = None
+        if user["id"] != member_id:
+            new_notification = booking_notification(user, new_cost)
+        booking = await write_booking(
+            Booking(
+                new_cost,
+                new_notification,
+                user["id"],
+                self._idempotency_key(booking_key, member_id, drink_type),
             )
-            new_notification = None
-            if auth_user_id != member_id:
-                notification_message = (
-                    f"{auth_user_name} hat ein '{description}' für dich hinzugefügt."
-                )
-                new_notification = Notification(
-                    member_id=member_id, message=notification_message
-                )
-                session.add(new_notification)
-                yield rx.toast.info(f"Benachrichtigung an {member_name} gesendet.")
-            session.commit()
-            session.refresh(new_cost)
-            self.last_booking_id = new_cost.id
-            self.last_booking_timestamp = datetime.now()
-            if new_notification:
-                session.refresh(new_notification)
-                self.last_notification_id = new_notification.id
-            else:
-                self.last_notification_id = -1
+        )
+        self.booking_key = uuid4().hex
+        if booking.duplicate:
+            return
+        if new_notification:
+            yield rx.toast.info(f"Benachrichtigung an {member_name} gesendet.")
         self.confirmation_details = {
             "member_name": member_name,
             "item_name": description,
@@ -273,23 +306,29 @@ class QuickEntryState(BaseState):
         }
         self.show_confirmation = True
         self.is_selection_open = False
+        self._discard_form(member_id)
         yield rx.toast.success(f"Drink added for {member_name}!")
 
     @rx.event
-    def undo_last_booking(self):
-        if self.last_booking_id <= 0:
-            return rx.toast.error("Keine Buchung zum Stornieren gefunden.")
-        with db_session() as session:
-            cost = session.get(Cost, self.last_booking_id)
-            if cost:
-                session.delete(cost)
-            if self.last_notification_id > 0:
-                notif = session.get(Notification, self.last_notification_id)
-                if notif:
-                    session.delete(notif)
-            session.commit()
-        self.last_booking_id = -1
-        self.last_notification_id = -1
-        self.last_booking_timestamp = None
+    async def undo_last_bookings(self, count: int):
+        """Revert the operator's last `count` bookings in one transaction."""
+        user = self._session_user()
+        if user is None:
+            yield rx.toast.error("You must be logged in.")
+            return
+        async with async_db_session() as session:
+            entries = await undo_bookings(session, user["id"], count)
+            await session.commit()
+        if not entries:
+            yield rx.toast.error("Keine Buchung zum Stornieren gefunden.")
+            return
+        await invalidate_cost_summaries()
+        await notification_hub.notify(
+            entry.member_id for entry in entries if entry.notification_id
+        )
         self.show_confirmation = False
-        yield rx.toast.success("Buchung erfolgreich rückgängig gemacht.")
\ No newline at end of file
+        self.undo_count = 1
+        if len(entries) == 1:
+            yield rx.toast.success("Buchung erfolgreich rückgängig gemacht.")
+        else:
+            yield rx.toast.success(f"{len(entries)} Buchungen rückgängig gemacht.")
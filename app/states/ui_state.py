@@ -10,4 +10,4 @@ class UIState(rx.State):
 
     @rx.event
     def close_mobile_menu(self):
-        self.mobile_menu_open = False
\ No newline at end of file
+        self.mobile_menu_open = False
@@ -0,0 +1,201 @@
+"""Group commit for cost bookings made from the quick-entry and tile pages.
+
+With BOOKING_WRITE_QUEUE=1 bookings arriving within
+BOOKING_WRITE_QUEUE_WINDOW_MS of each other are written in one transaction,
+so a round of drinks pays for one commit instead of one per tap. Every
+caller still gets the ids of its own cost and notification back. Without the
+flag each booking is committed on its own. Either way every booking is
+journaled, and one whose idempotency key is known is not written again,
+even when two requests with the same key race each other.
+"""
+
+from dataclasses import dataclass, replace
+from sqlalchemy.exc import IntegrityError
+from app.aggregates import invalidate_cost_summaries
+from app.database import async_db_session
+from app.journal import journal_entries
+from app.models import BookingJournal, Cost, Notification
+from app.notifications import add_notifications, notification_hub
+from app.rollup import record_costs
+import asyncio
+import logging
+import os
+
+BOOKING_WRITE_QUEUE = os.getenv("BOOKING_WRITE_QUEUE", "0").lower() in ("1", "true")
+BOOKING_WRITE_QUEUE_WINDOW_MS = float(os.getenv("BOOKING_WRITE_QUEUE_WINDOW_MS", "5"))
+BOOKING_WRITE_QUEUE_MAX_BATCH = int(os.getenv("BOOKING_WRITE_QUEUE_MAX_BATCH", "100"))
+
+
+@dataclass
+class BookingResult:
+    cost_id: int
+    notification_id: int | None
+    # True when the idempotency key was already journaled and nothing was written.
+    duplicate: bool = False
+
+
+@dataclass
+class Booking:
+    cost: Cost
+    notification: Notification | None
+    operator_id: int
+    key: str | None = None
+
+
+def _unsaved(booking: Booking) -> Booking:
+    """A copy of the booking whose cost and notification were never inserted."""
+    return replace(
+        booking,
+        cost=Cost.model_validate(booking.cost.model_dump(exclude={"id"})),
+        notification=(
+            Notification.model_validate(booking.notification.model_dump(exclude={"id"}))
+            if booking.notification
+            else None
+        ),
+    )
+
+
+async def _write_bookings(bookings: list[Booking]) -> list[BookingResult]:
+    """Insert the bookings, answering keys journaled meanwhile as duplicates."""
+    try:
+        return await _insert_bookings(bookings)
+    except IntegrityError:
+        if not any(booking.key for booking in bookings):
+            raise
+        # A concurrent request journaled one of the keys between our lookup
+        # and commit. The retry finds its entry and answers with its ids.
+        return await _insert_bookings([_unsaved(booking) for booking in bookings])
+
+
+async def _insert_bookings(bookings: list[Booking]) -> list[BookingResult]:
+    """Insert the costs and notifications with their rollup and counter deltas.
+
+    Notifications may be merged into an existing one, see add_notifications.
+    Bookings whose key is already journaled, or repeated within the batch,
+    are answered with the earlier booking's ids.
+    """
+    async with async_db_session() as session:
+        known = await journal_entries(
+            session, [booking.key for booking in bookings if booking.key]
+        )
+        claimed = set(known)
+        fresh = []
+        for booking in bookings:
+            if booking.key in claimed:
+                continue
+            if booking.key:
+                claimed.add(booking.key)
+            fresh.append(booking)
+        costs = [booking.cost for booking in fresh]
+        session.add_all(costs)
+        await record_costs(session, costs)
+        rows = await add_notifications(
+            session, [booking.notification for booking in fresh if booking.notification]
+        )
+        await session.flush()
+        row_ids = iter([row.id for row in rows])
+        results = {}
+        for booking in fresh:
+            entry = BookingJournal(
+                idempotency_key=booking.key,
+                operator_id=booking.operator_id,
+                member_id=booking.cost.member_id,
+                cost_id=booking.cost.id,
+                notification_id=next(row_ids) if booking.notification else None,
+            )
+            session.add(entry)
+            results[id(booking)] = BookingResult(entry.cost_id, entry.notification_id)
+            if booking.key:
+                known[booking.key] = entry
+        await session.commit()
+    if fresh:
+        await invalidate_cost_summaries()
+        await notification_hub.notify(row.member_id for row in rows)
+    return [
+        results.get(id(booking))
+        or BookingResult(
+            known[booking.key].cost_id,
+            known[booking.key].notification_id,
+            duplicate=True,
+        )
+        for booking in bookings
+    ]
+
+
+async def write_bookings(bookings: list[Booking]) -> list[BookingResult]:
+    """Persist a batch of bookings in one transaction, bypassing the queue."""
+    return await _write_bookings(bookings)
+
+
+class BookingWriteQueue:
+    """Collects bookings for a short window and commits them together."""
+
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._pending: list[tuple[Booking, asyncio.Future]] = []
+        self._timer: asyncio.Task | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, booking: Booking) -> BookingResult:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((booking, future))
+        if len(self._pending) >= self.max_batch:
+            # In its own task, so cancelling this caller cannot strand the
+            # other callers of the batch.
+            flush = asyncio.create_task(self._flush())
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+        return await future
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        await self._flush()
+
+    async def _flush(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            try:
+                results = await _write_bookings([booking for booking, _ in batch])
+            except Exception:
+                logging.exception(
+                    f"Group commit of {len(batch)} bookings failed, retrying singly."
+                )
+                await self._write_singly(batch)
+                return
+            for (_, future), result in zip(batch, results):
+                # A caller cancelled while waiting has cancelled its future.
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Booking write was interrupted."))
+
+    async def _write_singly(self, batch: list[tuple[Booking, asyncio.Future]]):
+        # One bad booking must not fail the rest of the batch.
+        for booking, future in batch:
+            try:
+                result = (await _write_bookings([_unsaved(booking)]))[0]
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+
+
+booking_queue = BookingWriteQueue(
+    BOOKING_WRITE_QUEUE_WINDOW_MS, BOOKING_WRITE_QUEUE_MAX_BATCH
+)
+
+
+async def write_booking(booking: Booking) -> BookingResult:
+    """Persist one booking, through the group-commit queue when enabled."""
+    if BOOKING_WRITE_QUEUE:
+        return await booking_queue.submit(booking)
+    return (await _write_bookings([booking]))[0]
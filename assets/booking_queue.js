@@ -0,0 +1,183 @@
+// Offline mode of /tile-entry: taps are kept in localStorage and sent to the
+// bulk booking endpoint in batches, so they survive a dropped connection and
+// do not wait for a websocket round trip each. Every tap keeps the session
+// it was made in, so it is booked for that operator even if someone else
+// logs in before the queue is sent.
+(function () {
+  if (window.kassenQueue) return;
+  const STORAGE_KEY = "kassen_booking_queue";
+  const FLUSH_DELAY_MS = 2000;
+  const RETRY_DELAY_MS = 15000;
+  const MAX_BATCH = 200;
+  let timer = null;
+  let flushing = false;
+
+  function load() {
+    try {
+      return JSON.parse(localStorage.getItem(STORAGE_KEY) || "[]");
+    } catch (error) {
+      return [];
+    }
+  }
+
+  function save(queue) {
+    localStorage.setItem(STORAGE_KEY, JSON.stringify(queue));
+    showStatus(queue);
+  }
+
+  function currentSession() {
+    const token = localStorage.getItem("kassen_session") || "";
+    try {
+      // Only to tell operators apart; the server checks the signature.
+      const payload = token.split(".")[0].replace(/-/g, "+").replace(/_/g, "/");
+      return { token, operatorId: JSON.parse(atob(payload)).id };
+    } catch (error) {
+      return null;
+    }
+  }
+
+  function showStatus(queue) {
+    const status = document.getElementById("booking-queue-status");
+    if (!status) return;
+    const expired = queue.filter((booking) => booking.expired).length;
+    const waiting = queue.length - expired;
+    const parts = [];
+    if (waiting) parts.push(`${waiting} nicht gesendet`);
+    if (expired) {
+      parts.push(`${expired} abgewiesen: Anmeldung abgelaufen, bitte neu anmelden`);
+    }
+    status.textContent = parts.length ? parts.join(", ") : "Alles gesendet";
+  }
+
+  function newKey() {
+    // crypto.randomUUID needs a secure context, tablets may use plain http.
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+  }
+
+  function today() {
+    const now = new Date();
+    const pad = (value) => String(value).padStart(2, "0");
+    return `${now.getFullYear()}-${pad(now.getMonth() + 1)}-${pad(now.getDate())}`;
+  }
+
+  function schedule(delay) {
+    if (timer !== null) return;
+    timer = setTimeout(() => {
+      timer = null;
+      flush();
+    }, delay);
+  }
+
+  function add(memberId, drinkType) {
+    const session = currentSession();
+    if (!session) return;
+    const queue = load();
+    queue.push({
+      key: newKey(),
+      member_id: memberId,
+      drink_type: drinkType,
+      date: today(),
+      token: session.token,
+      operator_id: session.operatorId,
+    });
+    save(queue);
+    const tile = document.getElementById(`tile-${memberId}`);
+    if (tile) {
+      tile.classList.add("ring-4", "ring-green-400");
+      setTimeout(() => tile.classList.remove("ring-4", "ring-green-400"), 400);
+    }
+    schedule(FLUSH_DELAY_MS);
+  }
+
+  function renewExpired() {
+    // Taps refused for an expired session go out again once the same
+    // operator has logged in anew, under the new session.
+    const session = currentSession();
+    if (!session) return;
+    const queue = load();
+    let renewed = false;
+    queue.forEach((booking) => {
+      // Taps queued before sessions were stored with them are adopted.
+      const adopt = !booking.token;
+      if (adopt || (booking.expired && booking.operator_id === session.operatorId)) {
+        booking.token = session.token;
+        booking.operator_id = session.operatorId;
+        delete booking.expired;
+        renewed = true;
+      }
+    });
+    if (renewed) save(queue);
+  }
+
+  async function flush() {
+    if (flushing) return;
+    renewExpired();
+    const pending = load().filter((booking) => !booking.expired);
+    if (!pending.length) return;
+    // One request per session, the server books it for that operator.
+    const token = pending[0].token;
+    const batch = pending
+      .filter((booking) => booking.token === token)
+      .slice(0, MAX_BATCH);
+    const keys = new Set(batch.map((booking) => booking.key));
+    flushing = true;
+    try {
+      const response = await fetch(window.kassenBulkBookingUrl, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          Authorization: `Bearer ${token}`,
+        },
+        body: JSON.stringify({
+          bookings: batch.map(({ key, member_id, drink_type, date }) => ({
+            key,
+            member_id,
+            drink_type,
+            date,
+          })),
+        }),
+      });
+      if (response.status === 401) {
+        // Retrying cannot help; keep the taps and say why they wait.
+        save(
+          load().map((booking) =>
+            keys.has(booking.key) ? { ...booking, expired: true } : booking
+          )
+        );
+        console.warn("Queued bookings refused: session expired.");
+        schedule(0);
+        return;
+      }
+      if (!response.ok) throw new Error(`HTTP ${response.status}`);
+      const { results } = await response.json();
+      results
+        .filter((result) => result.status === "rejected")
+        .forEach((result) => console.warn("Booking rejected", result));
+      // Booked, duplicate and rejected bookings are all settled.
+      const settled = new Set(results.map((result) => result.key));
+      save(load().filter((booking) => !settled.has(booking.key)));
+      schedule(0);
+    } catch (error) {
+      // Keys stay the same, so a batch that did reach the server is not
+      // booked twice when it is resent.
+      console.warn("Sending queued bookings failed, retrying.", error);
+      schedule(RETRY_DELAY_MS);
+    } finally {
+      flushing = false;
+    }
+  }
+
+  // Plain DOM listener instead of Reflex events: those wait for the
+  // websocket once any server event is queued.
+  document.addEventListener("click", (event) => {
+    const button = event.target.closest("[data-booking-drink]");
+    if (button) {
+      add(Number(button.dataset.bookingMember), button.dataset.bookingDrink);
+    }
+  });
+  window.addEventListener("online", flush);
+  window.kassenQueue = { add, flush };
+  setTimeout(() => showStatus(load()), 500);
+  schedule(FLUSH_DELAY_MS);
+})();
@@ -0,0 +1,27 @@
+// Clicks the "load older weeks" sentinel on /all-costs whenever it scrolls
+// into view, so older weeks are fetched on demand.
+(function () {
+  if (window.kassenInfiniteScroll) return;
+  const observed = new WeakSet();
+  const observer = new IntersectionObserver(
+    (entries) => {
+      entries.forEach((entry) => {
+        if (!entry.isIntersecting) return;
+        const sentinel = entry.target;
+        if (!sentinel.disabled) sentinel.click();
+        // Re-observe after the next week has rendered: if the sentinel is
+        // still visible the initial callback fires again and loads more.
+        observer.unobserve(sentinel);
+        setTimeout(() => observer.observe(sentinel), 500);
+      });
+    },
+    { rootMargin: "400px" }
+  );
+  window.kassenInfiniteScroll = setInterval(() => {
+    const sentinel = document.getElementById("load-older-weeks");
+    if (sentinel && !observed.has(sentinel)) {
+      observed.add(sentinel);
+      observer.observe(sentinel);
+    }
+  }, 500);
+})();
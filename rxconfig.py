@@ -1,3 +1,11 @@
 import reflex as rx
+import os
 
-config = rx.Config(app_name="app", plugins=[rx.plugins.TailwindV3Plugin()])
+config = rx.Config(
+    app_name="app",
+    db_url=os.getenv("DATABASE_URL", "sqlite:///association.db"),
+    # With Redis, state is shared and `reflex run --env prod` starts several
+    # backend workers, see DEPLOY_AZURE.md.
+    redis_url=os.getenv("REDIS_URL") or None,
+    plugins=[rx.plugins.TailwindV3Plugin()],
+)